@@ -0,0 +1,43 @@
+"""
+    This example measures parsing of 300-item events pages with
+    str decode + json.loads (previous deserialize_json), json and orjson
+    backends (_JSON_BACKEND) and raw mode (MGApiUtils.to_raw, body is
+    not parsed). Pass paths of recorded pages (raw response bodies)
+    as arguments, otherwise synthetic pages are generated.
+"""
+
+import json
+import sys
+import time
+try:
+    from mgapi.mgapi import Api as MailgunApi
+except:
+    print("Can't find mgapi module. ")
+    exit(0)
+from benchmark_pages import read_pages
+
+_ROUNDS = 50
+
+
+def measure(name, function):
+    start = time.perf_counter()
+    for _ in range(_ROUNDS):
+        for page in pages:
+            function(page)
+    print("{name:<28}: {ms:7.3f} ms/page".format(name=name, ms=(time.perf_counter() - start) / (_ROUNDS * len(pages)) * 1000))
+
+
+pages = read_pages(sys.argv[1:])
+
+api = MailgunApi(domain="example.io")
+measure("decode + json.loads", lambda page: json.loads(str(page, "utf8")))
+measure("json backend", api.deserialize_json)
+measure("json parse + serialize", lambda page: api.serialize_json(api.deserialize_json(page)))
+measure("raw mode", api.to_raw)
+
+try:
+    orjson_api = MailgunApi(domain="example.io", json_backend="orjson")
+    measure("orjson backend", orjson_api.deserialize_json)
+    measure("orjson parse + serialize", lambda page: orjson_api.serialize_json(orjson_api.deserialize_json(page)))
+except ImportError:
+    print("orjson backend skipped (pip install orjson)")
@@ -0,0 +1,34 @@
+"""
+    Events pages used by benchmark_serialization.py and benchmark_json.py:
+    recorded pages (raw response bodies) or synthetic 300-item page.
+"""
+
+import json
+
+
+def synthetic_page(items=300):
+    return json.dumps({
+        "items": [{
+            "id": "id-{i:06d}".format(i=i),
+            "event": "delivered",
+            "timestamp": 1529692199.626182 + i,
+            "recipient": "user{i}@example.io".format(i=i),
+            "tags": ["MyTag"],
+            "envelope": {"sender": "sender@example.io", "transport": "smtp", "targets": "user@example.io"},
+            "message": {"headers": {"message-id": "{i}@example.io".format(i=i), "subject": "Test mail"}, "size": 1024},
+            "delivery-status": {"code": 250, "message": "OK", "description": "", "attempt-no": 1},
+            "user-variables": {}
+        } for i in range(items)],
+        "paging": {"next": "https://api.mailgun.net/v3/example.io/events/next"}
+    }).encode("utf8")
+
+
+def read_pages(paths):
+    """
+        Returns recorded pages from paths, synthetic page if there are none
+    """
+    pages = []
+    for path in paths:
+        with open(path, "rb") as source:
+            pages.append(source.read())
+    return pages if pages else [synthetic_page()]
@@ -0,0 +1,50 @@
+"""
+    This example measures parsing of 300-item events pages with eager
+    serialization (sort_keys=True, indent=4 re-dump on every response)
+    and with lazy serialization (MGApiResponse) used by Api.to_json.
+    Unpacking the response (des, ser = ...) still builds serialized string,
+    only callers which index it (response[0], response.deserialized) skip it.
+    Pass paths of recorded pages (raw response bodies) as arguments,
+    otherwise synthetic pages are generated.
+"""
+
+import sys
+import time
+try:
+    from mgapi.mgapi import Api as MailgunApi
+except:
+    print("Can't find mgapi module. ")
+    exit(0)
+from benchmark_pages import read_pages
+
+_ROUNDS = 50
+
+
+api = MailgunApi(domain="example.io")
+pages = read_pages(sys.argv[1:])
+
+# Before: parse + pretty re-dump
+start = time.perf_counter()
+for _ in range(_ROUNDS):
+    for page in pages:
+        deserialized = api.justify(api.deserialize_json(page), "Operation succeeded.")
+        serialized = api.serialize_json(deserialized)
+eager = (time.perf_counter() - start) / (_ROUNDS * len(pages))
+
+# After, unpacked: serialized string is built when unpacked
+start = time.perf_counter()
+for _ in range(_ROUNDS):
+    for page in pages:
+        deserialized, serialized = api.to_json(page)
+unpacked = (time.perf_counter() - start) / (_ROUNDS * len(pages))
+
+# After, indexed: parse only, serialized string is never read
+start = time.perf_counter()
+for _ in range(_ROUNDS):
+    for page in pages:
+        deserialized = api.to_json(page)[0]
+lazy = (time.perf_counter() - start) / (_ROUNDS * len(pages))
+
+print("eager serialization     : {ms:7.3f} ms/page".format(ms=eager * 1000))
+print("lazy, des, ser = ...    : {ms:7.3f} ms/page".format(ms=unpacked * 1000))
+print("lazy, des = ...[0]      : {ms:7.3f} ms/page".format(ms=lazy * 1000))
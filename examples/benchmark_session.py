@@ -0,0 +1,60 @@
+"""
+    This example compares requests/sec of one-shot connections
+    (module-level requests.get, no keep-alive) with the pooled
+    keep-alive session used by Api. Runs against local stub server,
+    no Mailgun account needed.
+"""
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import threading
+import time
+import requests
+try:
+    from mgapi.mgapi import Api as MailgunApi
+except:
+    print("Can't find mgapi module. ")
+    exit(0)
+
+_REQUESTS = 500
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so the server keeps connections alive
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    body = b'{"items": [], "total_count": 0}'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *argv):
+        pass
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base_url = "http://127.0.0.1:{port}/v3".format(port=server.server_address[1])
+
+api = MailgunApi(base_url=base_url, domain="example.io", private_key="key-stub")
+
+# Before: new TCP connection for every call
+start = time.perf_counter()
+for _ in range(_REQUESTS):
+    requests.get(base_url + "/domains", auth=("api", "key-stub"), params={"limit": 100, "skip": 0})
+before = _REQUESTS / (time.perf_counter() - start)
+
+# After: pooled keep-alive session
+start = time.perf_counter()
+for _ in range(_REQUESTS):
+    des = api.get_domains()[0]
+after = _REQUESTS / (time.perf_counter() - start)
+
+api.close()
+server.shutdown()
+
+print("requests.get     : {rps:8.1f} req/s".format(rps=before))
+print("Api (keep-alive) : {rps:8.1f} req/s".format(rps=after))
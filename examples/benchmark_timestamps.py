@@ -0,0 +1,43 @@
+"""
+    This example compares per-event timestamp conversion (datetime and
+    email.utils for every value) with column conversion of MGApiTimestamps
+    over 1M event timestamps. Requires numpy, no Mailgun account needed.
+"""
+
+import datetime
+import time
+from email import utils
+try:
+    import numpy as np
+    from mgapi.mgapi import MGApiTimestamps
+except:
+    print("Can't find mgapi module or numpy. ")
+    exit(0)
+
+_TIMESTAMPS = 1000000
+
+# Events of one month, timestamps as returned by events endpoint
+timestamps = 1529692199.626182 + np.sort(np.random.default_rng(0).uniform(0, 30 * 86400, _TIMESTAMPS))
+events = [{"timestamp": timestamp} for timestamp in timestamps.tolist()]
+
+
+def measure(name, function):
+    start = time.perf_counter()
+    result = function()
+    print("{name:<28}: {seconds:7.3f} s".format(name=name, seconds=time.perf_counter() - start))
+    return result
+
+
+# Before: one value at a time
+utc = datetime.timezone.utc
+iso = measure("ISO8601 per event", lambda: [datetime.datetime.fromtimestamp(event["timestamp"], utc).isoformat() for event in events])
+measure("ISO8601 parse per event", lambda: [datetime.datetime.fromisoformat(value).timestamp() for value in iso])
+rfc = measure("RFC2822 per event", lambda: [utils.formatdate(event["timestamp"]) for event in events])
+measure("RFC2822 parse per event", lambda: [utils.mktime_tz(utils.parsedate_tz(value)) for value in rfc])
+
+# After: whole columns
+column = measure("column from events", lambda: MGApiTimestamps.from_events(events))
+iso = measure("ISO8601 column", lambda: MGApiTimestamps.to_iso8601(column))
+measure("ISO8601 parse column", lambda: MGApiTimestamps.from_iso8601(iso))
+rfc = measure("RFC2822 column", lambda: MGApiTimestamps.to_rfc2822(column))
+measure("RFC2822 parse column", lambda: MGApiTimestamps.from_rfc2822(rfc))
@@ -1,6 +1,8 @@
 """
     This example shows how to fetch data from mailgun api to generate json file with
-    analytics data for single tag.
+    analytics data for single tag. Events are streamed to compressed NDJSON file
+    (one event per line) as pages arrive, so memory usage doesn't depend on
+    number of events.
 """
 
 import pprint as pp
@@ -11,63 +13,34 @@ except:
     exit(0)
 
 
-def getReportData(tag):
+def getReportData(tag, events_path):
     """
         Generate mailing report data by single tag
     """
     # Connect to API
     api = MailgunApi(config_file="C:\\Users\\Account\Desktop\\config.json")
-    # Return
-    ret = {
-        "tag_info": {},
-        "tag_stats": {},
-        "aggregates": {},
-        "tag_events": {}
-    }
-    # validate, check tag
-    des, ser = api.get_tags(tag=tag)
+    # tag info, aggregates and tag stats are fetched concurrently,
+    # at most 'concurrency' requests at once
+    des, ser = api.get_report_data(tag=tag, days=30, concurrency=8, events=False)
     if not des["justify"]["success"]:
         print(des["justify"]["reason"])
         return False
-    ret["tag_info"] = des
-
-    # Get aggregates
-    for aggregate in api._AGGREGATES:
-        des, ser = api.get_tag_aggregates(tag=tag, aggregate=aggregate)
-        ret["aggregates"][aggregate] = des
-
-    # Get tag stats
-    for event in api._EVENTS:
-        des, ser = api.get_tag_stats(tag, event, start=api.nowRFC2822(days=-30))
-        ret["tag_stats"][event] = des
-
-    # Get tag events
+    # tag events (all event types) written page by page
     filter_fields = api.ret_events_filter_fields()
     filter_fields["tags"] = [tag]
-    for event in api._EVENTS:
-        tmp_array = []
-        filter_fields["event"] = event
-        # Get events for tag
-        des, ser = api.get_events(
-            begin=api.nowRFC2822(days= -30),
-            # we can set end parameter a little bit in the future
-            # just in case
-            end=api.nowRFC2822(minutes= 30),
-            filter_fields=filter_fields,
-            limit=290
-        )
-        tmp_array += des["items"]
-        exhausted = False
-        while not exhausted:
-            exhausted, des, ser = api.follow_pagination(Next=des["paging"]["next"])
-            tmp_array += des["items"]
-        ret["tag_events"][event] = tmp_array
-
-    ret_json = api.serialize_json(ret)
-    return ret, ret_json
+    count = api.export_events(
+        events_path,
+        begin=api.nowRFC2822(days=-30),
+        end=api.nowRFC2822(minutes=30),
+        filter_fields=filter_fields
+    )
+    print("Exported events:", count)
+    # seconds spent per section
+    pp.pprint(des["timings"])
+    return des, ser
 
 ## Change tag to your tag
-des, ser = getReportData(tag="MyTag")
+des, ser = getReportData(tag="MyTag", events_path="report_test_events.ndjson.gz")
 print(ser)
 
 with open("report_test.json", "wb") as source:
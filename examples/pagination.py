@@ -8,21 +8,35 @@ except:
 
 api = MailgunApi(config_file="C:\\Users\\Account\Desktop\\config.json")
 
-# first request
-all_events = []
-des, ser = api.get_events(
+# first request ([0] - deserialized only, serialized string isn't built)
+des = api.get_events(
     begin=api.nowRFC2822(days= -10),
     end=api.nowRFC2822(minutes= +15)
-    )
-all_events += des["items"]
+    )[0]
+number_of_events = len(des["items"])
 
 # follow request pagination 'next' link
 exhausted = False
 while not exhausted:
-    exhausted, des, ser = api.follow_pagination(Next=des["paging"]["next"])
-    all_events += des["items"]
+    exhausted, des = api.follow_pagination(Next=des["paging"]["next"])[:2]
+    number_of_events += len(des["items"])
 
-print("Number of events from last 10 days:", len(all_events))
+print("Number of events from last 10 days:", number_of_events)
+
+# same as above, but Api.iter_events follows pagination for you
+# and yields events one at a time (only one page is kept in memory)
+number_of_events = 0
+for event in api.iter_events(begin=api.nowRFC2822(days= -10), end=api.nowRFC2822(minutes= +15)):
+    number_of_events += 1
+
+print("Number of events from last 10 days:", number_of_events)
 
 # correct way of even polling is described here:
 # https://documentation.mailgun.com/en/latest/api-events.html#event-polling
+# Api.poll_events implements it, every run (e.g. from cron) yields only
+# events that previous runs didn't yield, progress is kept in checkpoint file
+number_of_new_events = 0
+for event in api.poll_events("events_checkpoint.json", begin=api.nowRFC2822(days= -1)):
+    number_of_new_events += 1
+
+print("Number of new settled events:", number_of_new_events)
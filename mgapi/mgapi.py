@@ -22,19 +22,1240 @@
 # SOFTWARE.
 
 # Requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
 from requests.exceptions import Timeout
 import requests
 
+# Iteration
+import bisect
+import heapq
+import itertools
+import random
+
+# Threading and asyncio
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import wait
+import asyncio
+import queue
+import threading
+try:
+    # Optional, required only by AsyncApi
+    import aiohttp
+except ImportError:
+    aiohttp = None
+try:
+    # Optional, used by stats tables (as_numpy=True)
+    import numpy as np
+except ImportError:
+    np = None
+
+# Files and storage
+import csv
+import gzip
+import io
+import os
+import sqlite3
+try:
+    # Optional, used by MGApiNDJSONWriter (compression="zstd")
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # Parsing and Printing
+from collections import OrderedDict
+from collections import deque
+from urllib.parse import urlencode
+from urllib.parse import urlparse
+import base64
+import hashlib
 import json
 import pprint as pp
+import re
+try:
+    # Optional, used when _JSON_BACKEND is "orjson"
+    import orjson
+except ImportError:
+    orjson = None
+
+# Logging
+import logging
+import sys
 
 # Time
 from email import utils
 import datetime
+import functools
 import time
 
+# Library logger, records are dropped unless logging is configured
+# (debug=True objects print through own child logger, see MGApiLogging.enable_debug_logging)
+logger = logging.getLogger("mgapi")
+logger.addHandler(logging.NullHandler())
+
+# Endpoint result
+class MGApiResponse():
+    """
+        Result of endpoint methods, unpacks like tuple:
+            deserialized, serialized = api.get_domains()
+        serialized (str) is built when unpacked or accessed (response[1],
+        response.serialized), response[0] and response.deserialized don't
+        serialize. deserialized is serialized as it is at that moment.
+        prefix - values before deserialized (e.g. exhausted, see follow_pagination)
+    """
+    def __init__(self, deserialized, serialized=None, serialize_function=None, prefix=()):
+        self.deserialized = deserialized
+        self.serialize_function = serialize_function
+        self._serialized = serialized
+        self._values = tuple(prefix) + (deserialized,)
+    @property
+    def serialized(self):
+        if self._serialized is None and self.serialize_function is not None:
+            self._serialized = self.serialize_function(self.deserialized)
+            self.serialize_function = None
+        return self._serialized
+    def __len__(self):
+        return len(self._values) + 1
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if 0 <= index < len(self._values):
+            return self._values[index]
+        if index == len(self._values):
+            return self.serialized
+        raise IndexError("MGApiResponse index out of range")
+    def __iter__(self):
+        yield from self._values
+        yield self.serialized
+    def __eq__(self, other):
+        return tuple(self) == (tuple(other) if isinstance(other, MGApiResponse) else other)
+    __hash__ = None
+    def __repr__(self):
+        return repr(tuple(self))
+# Response without requests.Response object
+class MGApiResult():
+    """
+        Minimal request result (status_code, content, headers) used where
+        requests.Response object is not available (e.g. AsyncApi)
+    """
+    def __init__(self, status_code, content, headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers if headers is not None else {}
+# Exceptions
+class MGApiException(Exception):
+    """
+        Raised by generators (Api.iter_*) when request fails,
+        endpoint methods return justification instead.
+    """
+    def __init__(self, deserialized):
+        self.deserialized = deserialized
+        self.justify = deserialized["justify"]
+        Exception.__init__(self, "{msg} | {reason}".format(
+            msg=self.justify["msg"],
+            reason=self.justify["reason"]
+        ))
+# Rate limiting
+class MGApiRateLimiter():
+    """
+        Thread safe token buckets, one per (domain, endpoint family) key.
+        Rate is looked up in rates dictionary by (domain, family), then
+        family, then "default" key (None values are skipped), no rate means unlimited.
+        On 429/5xx response bucket waits for Retry-After and halves its rate,
+        successful responses bring it back to configured rate.
+        Unlimited bucket throttled without Retry-After gets adaptive rate
+        seeded from its observed request rate (seed_rate if there is none).
+    """
+    def __init__(self, rates, burst=1, backoff_factor=0.5, recovery_step=0.05, seed_rate=1.0):
+        self.rates = rates
+        self.burst = burst
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self.seed_rate = seed_rate
+        self.buckets = {}
+        self._lock = threading.Lock()
+    def ret_rate(self, key):
+        """
+        summary:
+            Returns configured rate (requests per second) for key
+        params:
+            key - (domain, family) tuple
+        returns: (1 value/s)
+            requests per second or None (unlimited)
+        """
+        domain, family = key
+        for rate_key in (key, family, "default"):
+            if self.rates.get(rate_key) is not None:
+                return self.rates[rate_key]
+        return None
+    def ret_bucket(self, key, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = {
+                "rate": self.ret_rate(key),
+                "tokens": float(self.burst),
+                "updated": now,
+                "blocked_until": 0.0,
+                "factor": 1.0,
+                # Mean interval between requests of unlimited bucket (see feedback)
+                "interval": None,
+                "last": None
+            }
+            self.buckets[key] = bucket
+        return bucket
+    def reserve(self, key):
+        """
+        summary:
+            Takes token from bucket if there is one
+        params:
+            key - (domain, family) tuple
+        returns: (1 value/s)
+            0 if token was taken else number of seconds to wait before retrying
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self.ret_bucket(key, now)
+            if now < bucket["blocked_until"]:
+                return bucket["blocked_until"] - now
+            if bucket["rate"] is None:
+                if bucket["last"] is not None:
+                    interval = now - bucket["last"]
+                    bucket["interval"] = interval if bucket["interval"] is None else 0.8 * bucket["interval"] + 0.2 * interval
+                bucket["last"] = now
+                return 0
+            rate = bucket["rate"] * bucket["factor"]
+            bucket["tokens"] = min(float(self.burst), bucket["tokens"] + (now - bucket["updated"]) * rate)
+            bucket["updated"] = now
+            if bucket["tokens"] >= 1:
+                bucket["tokens"] -= 1
+                return 0
+            return (1 - bucket["tokens"]) / rate
+    def acquire(self, key):
+        """
+        summary:
+            Blocks until token for key is available
+        """
+        wait_seconds = self.reserve(key)
+        while wait_seconds:
+            time.sleep(wait_seconds)
+            wait_seconds = self.reserve(key)
+    async def acquire_async(self, key):
+        """
+        summary:
+            acquire for asyncio (doesn't block event loop)
+        """
+        wait_seconds = self.reserve(key)
+        while wait_seconds:
+            await asyncio.sleep(wait_seconds)
+            wait_seconds = self.reserve(key)
+    def feedback(self, key, status_code, retry_after=None):
+        """
+        summary:
+            Adapts bucket to response: backs off on 429/5xx, recovers otherwise
+        params:
+            key - (domain, family) tuple
+            status_code - response status code
+            retry_after - value of Retry-After header (seconds or HTTP date)
+        """
+        throttled = status_code == 429 or status_code >= 500
+        with self._lock:
+            now = time.monotonic()
+            bucket = self.ret_bucket(key, now)
+            if not throttled:
+                bucket["factor"] = min(1.0, bucket["factor"] + self.recovery_step)
+                return
+            delay = self.ret_retry_after_seconds(retry_after)
+            if delay is None and bucket["rate"] is None:
+                # Nothing configured and server gave no hint, start adapting
+                # from rate requests were actually sent at
+                interval = bucket["interval"]
+                bucket["rate"] = 1 / interval if interval else self.seed_rate
+                bucket["factor"] = 1.0
+            bucket["factor"] = max(0.05, bucket["factor"] * self.backoff_factor)
+            bucket["tokens"] = 0.0
+            bucket["updated"] = now
+            if delay is None and bucket["rate"] is not None:
+                delay = 1 / (bucket["rate"] * bucket["factor"])
+            if delay:
+                bucket["blocked_until"] = max(bucket["blocked_until"], now + delay)
+    def ret_retry_after_seconds(self, retry_after):
+        """
+        summary:
+            Parses Retry-After header value (seconds or HTTP date)
+        returns: (1 value/s)
+            number of seconds or None
+        """
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            retry_datetime = utils.parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_datetime.timestamp() - time.time())
+# Retrying
+class MGApiRetryPolicy():
+    """
+        Retry policy used by requestEx: exponential backoff
+        (min(backoff_cap, backoff_base * 2 ** attempt), full jitter if jitter=True)
+        for timeouts, connection errors and retry_statuses.
+        Only requests with method in methods are retried unless
+        request is made with retry=True (or retry=False).
+        stats - counters of retries and time they added to requests
+    """
+    def __init__(self, max_attempts=3, backoff_base=0.5, backoff_cap=30.0, jitter=True,
+                 retry_statuses=(429, 500, 502, 503, 504), methods=("GET",)):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retry_statuses = set(retry_statuses)
+        self.methods = set(methods)
+        self.stats = {
+            "requests": 0,
+            "retried_requests": 0,
+            "retries": 0,
+            "retry_seconds": 0.0
+        }
+        self._lock = threading.Lock()
+    def should_retry(self, method, attempt, retry=None):
+        """
+        summary:
+            Decides if failed attempt should be retried
+        params:
+            method - {GET, POST, PUT, DELETE}
+            attempt - number of retries made so far
+            retry - True/False overrides methods, None - use methods
+        returns: (1 value/s)
+            Bool
+        """
+        if retry is None:
+            retry = method in self.methods
+        return retry and attempt + 1 < self.max_attempts
+    def ret_delay(self, attempt):
+        """
+        summary:
+            Returns backoff delay (seconds) before next retry
+        params:
+            attempt - number of retries made so far
+        """
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** attempt)
+        return random.uniform(0, delay) if self.jitter else delay
+    def record(self, retries, retry_seconds):
+        """
+        summary:
+            Adds finished request to stats
+        params:
+            retries - number of retries made
+            retry_seconds - time added by retries (backoff and retried attempts)
+        """
+        with self._lock:
+            self.stats["requests"] += 1
+            if retries:
+                self.stats["retried_requests"] += 1
+                self.stats["retries"] += retries
+                self.stats["retry_seconds"] += retry_seconds
+# Instrumentation
+class MGApiMetrics():
+    """
+        Request metrics by caller (e.g. "Api.get_events", see parseResponse):
+            latency histogram (including retries), bytes sent/received,
+            status codes, retries, parse and serialize time
+        and OpenTelemetry-style spans of last 'max_spans' requests.
+        Enabled by Api.enable_metrics (disabled - no overhead but
+        'if self.metrics is not None' checks), e.g:
+            metrics = api.enable_metrics()
+            api.get_domains()
+            print(metrics.to_prometheus())
+    """
+    _BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets=None, max_spans=1024, on_span=None):
+        """
+        params:
+            buckets - upper bounds (seconds) of latency histogram
+            max_spans - number of finished spans kept (see ret_spans)
+            on_span - function called with every finished span (e.g. to forward it)
+        """
+        self.buckets = tuple(sorted(buckets)) if buckets is not None else self._BUCKETS
+        self.spans = deque(maxlen=max_spans)
+        self.on_span = on_span
+        self.series = {}
+        self._lock = threading.Lock()
+        # Request waiting for its parseResponse, per thread
+        # (requestEx and parseResponse of one call run without switching)
+        self._pending = threading.local()
+    def ret_series(self, caller):
+        series = self.series.get(caller)
+        if series is None:
+            series = self.series.setdefault(caller, {
+                "latency_buckets": [0] * (len(self.buckets) + 1),
+                "latency_sum": 0.0,
+                "requests": 0,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+                "statuses": {},
+                "retries": 0,
+                "parse_sum": 0.0,
+                "parse_count": 0,
+                "serialize_sum": 0.0,
+                "serialize_count": 0
+            })
+        return series
+    def record_request(self, method, url, endpoint, start, duration, status, bytes_sent, bytes_received, retries, reason):
+        """
+        summary:
+            Called by requestEx, request is recorded when its response
+            is parsed (see record_response) to know caller
+        params:
+            start - time.time() of first attempt
+            duration - seconds until last response (time.perf_counter)
+            status - last status code (None - no response)
+        """
+        self.flush()
+        self._pending.request = {
+            "method": method, "url": url, "endpoint": endpoint, "start": start, "end": start + duration,
+            "duration": duration, "status": status,
+            "bytes_sent": bytes_sent, "bytes_received": bytes_received, "retries": retries, "reason": reason
+        }
+    def record_response(self, caller, parse_seconds):
+        """
+        summary:
+            Called by parseResponse, records pending request under caller
+        """
+        request = getattr(self._pending, "request", None)
+        self._pending.request = None
+        with self._lock:
+            series = self.ret_series(caller)
+            series["parse_sum"] += parse_seconds
+            series["parse_count"] += 1
+            if request is not None:
+                self.add_request(series, request)
+        if request is not None:
+            self.add_span(caller, request, parse_seconds)
+    def timed_serialize(self, caller, serialize_function):
+        """
+        summary:
+            Wraps serialize function of lazy serialized response (MGApiResponse)
+        """
+        def serialize(json_object):
+            start = time.perf_counter()
+            serialized = serialize_function(json_object)
+            seconds = time.perf_counter() - start
+            with self._lock:
+                series = self.ret_series(caller)
+                series["serialize_sum"] += seconds
+                series["serialize_count"] += 1
+            return serialized
+        return serialize
+    def flush(self):
+        """
+        summary:
+            Records request which wasn't parsed under "MGApiRequests.requestEx"
+        """
+        request = getattr(self._pending, "request", None)
+        if request is None:
+            return
+        self._pending.request = None
+        with self._lock:
+            self.add_request(self.ret_series("MGApiRequests.requestEx"), request)
+        self.add_span("MGApiRequests.requestEx", request, None)
+    def add_request(self, series, request):
+        latency = request["duration"]
+        series["latency_buckets"][bisect.bisect_left(self.buckets, latency)] += 1
+        series["latency_sum"] += latency
+        series["requests"] += 1
+        series["bytes_sent"] += request["bytes_sent"]
+        series["bytes_received"] += request["bytes_received"]
+        series["retries"] += request["retries"]
+        status = str(request["status"]) if request["status"] is not None else "error"
+        series["statuses"][status] = series["statuses"].get(status, 0) + 1
+    def add_span(self, caller, request, parse_seconds):
+        domain, family = request["endpoint"]
+        span = {
+            "name": caller,
+            "kind": "CLIENT",
+            "trace_id": "{value:032x}".format(value=random.getrandbits(128)),
+            "span_id": "{value:016x}".format(value=random.getrandbits(64)),
+            "start_time_unix_nano": int(request["start"] * 1e9),
+            "end_time_unix_nano": int(request["end"] * 1e9),
+            "attributes": {
+                "http.request.method": request["method"],
+                "url.full": request["url"],
+                "http.response.status_code": request["status"],
+                "http.request.body.size": request["bytes_sent"],
+                "http.response.body.size": request["bytes_received"],
+                "mgapi.domain": domain,
+                "mgapi.endpoint": family,
+                "mgapi.retries": request["retries"],
+                "mgapi.parse_seconds": parse_seconds
+            },
+            "status": {"code": "OK", "message": ""} if request["status"] == 200 or request["status"] == 304
+                      else {"code": "ERROR", "message": request["reason"] or ""}
+        }
+        self.spans.append(span)
+        if self.on_span is not None:
+            self.on_span(span)
+    def ret_spans(self, clear=False):
+        """
+        returns: (1 value/s)
+            list of finished spans (oldest first)
+        """
+        self.flush()
+        with self._lock:
+            spans = list(self.spans)
+            if clear:
+                self.spans.clear()
+        return spans
+    def to_prometheus(self):
+        """
+        summary:
+            Metrics in Prometheus text exposition format
+        returns: (1 value/s)
+            string
+        """
+        self.flush()
+        lines = []
+
+        def header(name, kind, text):
+            lines.append("# HELP {name} {text}".format(name=name, text=text))
+            lines.append("# TYPE {name} {kind}".format(name=name, kind=kind))
+
+        def label(caller, **extra):
+            labels = [("caller", caller)] + sorted(extra.items())
+            return ",".join('{key}="{value}"'.format(key=key, value=str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                            for key, value in labels)
+
+        with self._lock:
+            series = sorted(self.series.items())
+            header("mgapi_request_duration_seconds", "histogram", "Request latency including retries")
+            for caller, values in series:
+                cumulative = 0
+                for bound, count in zip(list(self.buckets) + ["+Inf"], values["latency_buckets"]):
+                    cumulative += count
+                    lines.append("mgapi_request_duration_seconds_bucket{{{labels}}} {value}".format(
+                        labels=label(caller, le=bound), value=cumulative))
+                lines.append("mgapi_request_duration_seconds_sum{{{labels}}} {value}".format(labels=label(caller), value=values["latency_sum"]))
+                lines.append("mgapi_request_duration_seconds_count{{{labels}}} {value}".format(labels=label(caller), value=values["requests"]))
+            for name, key, text in [
+                ("mgapi_request_bytes_sent_total", "bytes_sent", "Request body bytes"),
+                ("mgapi_response_bytes_received_total", "bytes_received", "Response body bytes"),
+                ("mgapi_request_retries_total", "retries", "Retries of failed requests")
+            ]:
+                header(name, "counter", text)
+                for caller, values in series:
+                    lines.append("{name}{{{labels}}} {value}".format(name=name, labels=label(caller), value=values[key]))
+            header("mgapi_responses_total", "counter", "Responses by status code (error - no response)")
+            for caller, values in series:
+                for status, count in sorted(values["statuses"].items()):
+                    lines.append("mgapi_responses_total{{{labels}}} {value}".format(labels=label(caller, status=status), value=count))
+            for name, key, text in [
+                ("mgapi_parse_duration_seconds", "parse", "Response parsing time"),
+                ("mgapi_serialize_duration_seconds", "serialize", "Response serialization time")
+            ]:
+                header(name, "summary", text)
+                for caller, values in series:
+                    lines.append("{name}_sum{{{labels}}} {value}".format(name=name, labels=label(caller), value=values[key + "_sum"]))
+                    lines.append("{name}_count{{{labels}}} {value}".format(name=name, labels=label(caller), value=values[key + "_count"]))
+        return "\n".join(lines) + "\n"
+# Vectorized stats
+class MGApiStats():
+    """
+        Stats as contiguous numpy arrays (requires numpy):
+            time   - unix timestamps (UTC), shape (intervals,)
+            values - counters, shape (len(names), intervals), one row per counter
+            names  - counter names e.g: "delivered.total" or "example.io/MyTag:delivered.total"
+        Created by MGApiUtils.ret_stats or MGApiStats.from_table (see Api.get_stats_table)
+        resolutions - resolutions from finest to coarsest (default _RESOLUTIONS of MGApiConfiguration)
+    """
+    def __init__(self, time, names, values, resolution="day", resolutions=None):
+        if np is None:
+            raise ImportError("MGApiStats requires numpy (pip install numpy)")
+        self.resolutions = resolutions if resolutions is not None else MGApiConfiguration()._RESOLUTIONS
+        self.time = np.ascontiguousarray(time, dtype=np.float64)
+        self.names = list(names)
+        self.values = np.ascontiguousarray(values, dtype=np.float64).reshape(len(self.names), len(self.time))
+        self.resolution = resolution
+        self.index = {name: position for position, name in enumerate(self.names)}
+    @classmethod
+    def from_table(cls, table, resolution="day", resolutions=None):
+        """
+        summary:
+            Creates MGApiStats from table of Api.get_stats_table
+        """
+        names = list(table["columns"].keys())
+        return cls(table["time"], names, [table["columns"][name] for name in names], resolution=resolution,
+                   resolutions=resolutions)
+    def column(self, name):
+        """
+        summary:
+            Returns counter values (view, no copy)
+        """
+        return self.values[self.index[name]]
+    def resample(self, resolution):
+        """
+        summary:
+            Sums counters into coarser intervals: hour -> day -> month (UTC)
+        params:
+            resolution - {day, month}
+        returns: (1 value/s)
+            MGApiStats object
+        """
+        if self.resolutions.index(resolution) < self.resolutions.index(self.resolution):
+            raise ValueError("Can't resample {current} stats to {resolution}".format(current=self.resolution, resolution=resolution))
+        seconds = self.time.astype("datetime64[s]")
+        unit = "D" if resolution == "day" else "M" if resolution == "month" else "h"
+        buckets = seconds.astype("datetime64[{unit}]".format(unit=unit)).astype("datetime64[s]").astype(np.float64)
+        time, inverse = np.unique(buckets, return_inverse=True)
+        values = np.zeros((len(self.names), len(time)))
+        np.add.at(values.T, inverse, self.values.T)
+        return MGApiStats(time, self.names, values, resolution=resolution, resolutions=self.resolutions)
+    def rolling_sum(self, window, name=None):
+        """
+        summary:
+            Sum of last 'window' intervals (first window-1 values are partial sums)
+        params:
+            window - number of intervals, >= 1
+            name - counter name (None - all counters)
+        returns: (1 value/s)
+            numpy array, shape (intervals,) or (len(names), intervals)
+        raises:
+            ValueError - if window is less than 1
+        """
+        if window < 1:
+            raise ValueError("window must be >= 1, got {window}".format(window=window))
+        values = self.values if name is None else self.column(name)
+        cumulative = np.cumsum(values, axis=-1)
+        ret = cumulative.copy()
+        ret[..., window:] = cumulative[..., window:] - cumulative[..., :-window]
+        return ret
+    def rate(self, numerator, denominator):
+        """
+        summary:
+            numerator / denominator per interval (0 where denominator is 0)
+        """
+        numerator, denominator = self.column(numerator), self.column(denominator)
+        ret = np.zeros(len(self.time))
+        np.divide(numerator, denominator, out=ret, where=denominator != 0)
+        return ret
+    def ret_name(self, scope, counter):
+        return "{scope}:{counter}".format(scope=scope, counter=counter) if scope else counter
+    def delivery_rate(self, scope=None):
+        """
+            delivered.total / accepted.total (scope - see Api.get_stats_table column names)
+        """
+        return self.rate(self.ret_name(scope, "delivered.total"), self.ret_name(scope, "accepted.total"))
+    def open_rate(self, scope=None):
+        """
+            opened.total / delivered.total
+        """
+        return self.rate(self.ret_name(scope, "opened.total"), self.ret_name(scope, "delivered.total"))
+    def click_rate(self, scope=None):
+        """
+            clicked.total / delivered.total
+        """
+        return self.rate(self.ret_name(scope, "clicked.total"), self.ret_name(scope, "delivered.total"))
+# Vectorized timestamps
+class MGApiTimestamps():
+    """
+        Converts whole columns of timestamps in one pass (columns require numpy):
+            epoch   - unix timestamps (float, UTC) e.g: event["timestamp"]
+            ISO8601 - "2018-06-22T18:29:59.626182Z"
+            RFC2822 - "Fri, 22 Jun 2018 18:29:59 +0000"
+        Scalar rfc2822/parse_rfc2822 (begin/end params) are cached.
+    """
+    _DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    _MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    _CHUNK = 65536
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def ret_rfc2822(seconds):
+        return utils.formatdate(seconds, localtime=True)
+    @classmethod
+    def rfc2822(cls, timestamp):
+        """
+        summary:
+            Formats unix timestamp as RFC2822 in local timezone
+            (cached per second, DST-correct)
+        """
+        return cls.ret_rfc2822(int(timestamp))
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def parse_rfc2822(rfc2822_string):
+        """
+        summary:
+            Parses RFC2822 string (cached)
+        returns: (1 value/s)
+            unix timestamp (float)
+        raises:
+            ValueError - if string isn't RFC2822 datetime
+        """
+        parsed = utils.parsedate_tz(rfc2822_string)
+        if parsed is None:
+            raise ValueError("Not RFC2822 datetime: {value}".format(value=rfc2822_string))
+        return float(utils.mktime_tz(parsed))
+    @staticmethod
+    def from_events(events, field="timestamp"):
+        """
+        summary:
+            Collects timestamps of events into float64 array
+        """
+        if np is None:
+            raise ImportError("MGApiTimestamps requires numpy (pip install numpy)")
+        return np.fromiter((event[field] for event in events), dtype=np.float64)
+    @staticmethod
+    def to_iso8601(timestamps):
+        """
+        summary:
+            unix timestamps -> ISO8601 strings (UTC, microseconds, "Z" suffix)
+        """
+        if np is None:
+            raise ImportError("MGApiTimestamps requires numpy (pip install numpy)")
+        microseconds = np.round(np.asarray(timestamps, dtype=np.float64) * 1e6).astype(np.int64)
+        return np.datetime_as_string(microseconds.astype("datetime64[us]"), unit="us", timezone="UTC")
+    @classmethod
+    def from_iso8601(cls, strings):
+        """
+        summary:
+            ISO8601 strings -> unix timestamps
+            Strings without offset are UTC, "Z" and +hh:mm offsets are applied
+            Canonical strings ("2018-06-22T18:29:59[.ffffff][Z|+hh:mm]") are parsed by numpy,
+            other forms one by one
+        """
+        if np is None:
+            raise ImportError("MGApiTimestamps requires numpy (pip install numpy)")
+        strings = np.asarray(strings, dtype=np.str_).ravel()
+        ret = np.empty(len(strings), dtype=np.float64)
+        # Chunks keep character matrix small
+        for start in range(0, len(strings), cls._CHUNK):
+            chunk = strings[start:start + cls._CHUNK]
+            ret[start:start + len(chunk)], canonical = cls.ret_iso8601_chunk(chunk)
+            for index in np.flatnonzero(~canonical):
+                parsed = datetime.datetime.fromisoformat(str(chunk[index]))
+                if parsed.tzinfo is None:
+                    parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+                ret[start + index] = parsed.timestamp()
+        return ret
+    @staticmethod
+    def ret_iso8601_chunk(strings):
+        """
+        returns: (2 value/s)
+            unix timestamps and mask of canonical strings (others are garbage)
+        """
+        rows = np.arange(len(strings))
+        # Non-ASCII characters are clipped (never digits or separators)
+        chars = np.minimum(strings.astype("<U32").view(np.uint32).reshape(len(strings), 32), 255).astype(np.int16)
+        digits = chars - ord("0")
+        isdigit = (digits >= 0) & (digits <= 9)
+
+        def number(start, stop):
+            ret = np.zeros(len(strings), dtype=np.int64)
+            for position in range(start, stop):
+                ret = ret * 10 + digits[:, position]
+            return ret
+
+        layout = (
+            isdigit[:, [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]].all(axis=1)
+            & (chars[:, 4] == ord("-")) & (chars[:, 7] == ord("-")) & np.isin(chars[:, 10], [ord("T"), ord(" ")])
+            & (chars[:, 13] == ord(":")) & (chars[:, 16] == ord(":"))
+        )
+        # Fraction (up to microseconds)
+        dot = chars[:, 19] == ord(".")
+        run = np.cumprod(isdigit[:, 20:27], axis=1) * dot[:, None]
+        fraction_digits = run.sum(axis=1)
+        microseconds = (digits[:, 20:26] * run[:, :6] * 10 ** np.arange(5, -1, -1)).sum(axis=1)
+        # Zone: nothing (UTC), Z or +hh:mm
+        position = 19 + dot * (1 + fraction_digits)
+        zone = chars[rows, np.minimum(position, 31)]
+        signed = (zone == ord("+")) | (zone == ord("-"))
+        zone_columns = np.minimum(position[:, None] + [1, 2, 3, 4, 5], 31)
+        zone_digits = digits[rows[:, None], zone_columns]
+        zone_valid = ~signed | ((zone_digits[:, [0, 1, 3, 4]] >= 0) & (zone_digits[:, [0, 1, 3, 4]] <= 9)).all(axis=1) & (chars[rows, zone_columns[:, 2]] == ord(":"))
+        offset = np.where(zone == ord("-"), -1, 1) * signed * (
+            (zone_digits[:, 0] * 10 + zone_digits[:, 1]) * 3600 + (zone_digits[:, 3] * 10 + zone_digits[:, 4]) * 60
+        )
+        end = position + signed * 6 + (zone == ord("Z"))
+        canonical = layout & (fraction_digits <= 6) & zone_valid & (end == np.char.str_len(strings))
+        # Date -> days since epoch
+        months = np.where(canonical, (number(0, 4) - 1970) * 12 + number(5, 7) - 1, 0)
+        days = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) + number(8, 10) - 1
+        seconds = days * 86400 + number(11, 13) * 3600 + number(14, 16) * 60 + number(17, 19) - offset
+        return seconds + microseconds / 1e6, canonical
+    @classmethod
+    def to_rfc2822(cls, timestamps, utc_offset=0):
+        """
+        summary:
+            unix timestamps -> RFC2822 strings
+            Day part is formatted once per distinct day, clock part by numpy
+        params:
+            utc_offset - timezone offset in seconds (e.g: 7200 -> "+0200")
+        """
+        if np is None:
+            raise ImportError("MGApiTimestamps requires numpy (pip install numpy)")
+        seconds = np.floor(np.asarray(timestamps, dtype=np.float64).ravel() + utc_offset).astype(np.int64)
+        if len(seconds) == 0:
+            return np.array([], dtype="<U31")
+        days, inverse = np.unique(seconds // 86400, return_inverse=True)
+        prefixes = np.array([cls.ret_day_prefix(day) for day in days.tolist()], dtype="<U17")
+        clock = np.datetime_as_string(seconds.astype("datetime64[s]"), unit="s").astype("<U19")
+        sign = "-" if utc_offset < 0 else "+"
+        zone = " {sign}{hours:02d}{minutes:02d}".format(sign=sign, hours=abs(utc_offset) // 3600, minutes=abs(utc_offset) % 3600 // 60)
+        chars = np.concatenate([
+            prefixes.view("<U1").reshape(len(days), 17)[inverse],
+            clock.view("<U1").reshape(len(seconds), 19)[:, 11:19],
+            np.broadcast_to(np.array(list(zone)), (len(seconds), 6))
+        ], axis=1)
+        return np.ascontiguousarray(chars).view("<U31").ravel()
+    @classmethod
+    def ret_day_prefix(cls, day):
+        date = datetime.date(1970, 1, 1) + datetime.timedelta(days=day)
+        return "{weekday}, {day:02d} {month} {year:04d} ".format(
+            weekday=cls._DAYS[date.weekday()], day=date.day, month=cls._MONTHS[date.month - 1], year=date.year
+        )
+    @classmethod
+    def from_rfc2822(cls, strings):
+        """
+        summary:
+            RFC2822 strings -> unix timestamps
+            Canonical strings ("Fri, 22 Jun 2018 18:29:59 +0000") are parsed by numpy,
+            other forms one by one (see parse_rfc2822)
+        """
+        if np is None:
+            raise ImportError("MGApiTimestamps requires numpy (pip install numpy)")
+        strings = np.asarray(strings, dtype=np.str_).ravel()
+        chars = strings.astype("<U31").view("<U1").reshape(len(strings), 31)
+        months = np.ascontiguousarray(chars[:, 8:11]).view("<U3").ravel()
+        month_index = np.searchsorted(sorted(cls._MONTHS), months).clip(0, 11)
+        canonical = (np.char.str_len(strings) == 31) & (chars[:, 3] == ",") & (np.array(sorted(cls._MONTHS))[month_index] == months)
+        month_numbers = np.array([list("{month:02d}".format(month=cls._MONTHS.index(name) + 1)) for name in sorted(cls._MONTHS)])
+        iso = np.concatenate([
+            chars[:, 12:16], np.full((len(strings), 1), "-"), month_numbers[month_index],
+            np.full((len(strings), 1), "-"), chars[:, 5:7], np.full((len(strings), 1), "T"), chars[:, 17:25]
+        ], axis=1)
+        iso = np.ascontiguousarray(iso).view("<U19").ravel().copy()
+        iso[~canonical] = "NaT"
+        ret = iso.astype("datetime64[s]").astype(np.int64).astype(np.float64)
+        zone = np.ascontiguousarray(chars[:, 27:31]).view("<U4").ravel().copy()
+        zone[~canonical] = "0000"
+        zone = zone.astype(np.int64)
+        ret -= np.where(chars[:, 26] == "-", -1, 1) * (zone // 100 * 3600 + zone % 100 * 60)
+        for index in np.flatnonzero(~canonical):
+            ret[index] = cls.parse_rfc2822(str(strings[index]))
+        return ret
+# Suppression lookups
+class MGApiSupressionIndex():
+    """
+        In-process index of bounced, unsubscribed and complained addresses
+        of one domain (O(1) lookups), e.g:
+            index = MGApiSupressionIndex()
+            index.refresh(api, full=True)
+            api.supression_index = index # send_single_message skips suppressed recipients
+            ...
+            index.refresh(api)           # adds new items
+        Every refresh downloads whole bounces, unsubscribes and complaints
+        listings (Mailgun doesn't filter them by date). refresh() adds items
+        missing from index to live index, removed suppressions are dropped
+        only by full refresh. Full refresh builds new index aside and swaps
+        it in, lookups never see partially built index.
+    """
+    _SUPRESSIONS = ["bounces", "unsubscribes", "complaints"]
+
+    def __init__(self):
+        self.bounces = set()
+        self.complaints = set()
+        # address -> set of tags ("*" - all messages)
+        self.unsubscribes = {}
+        self._lock = threading.Lock()
+    def add(self, get_what, item, index=None):
+        """
+        summary:
+            Adds single item (api response item) to index
+        params:
+            index - (bounces, complaints, unsubscribes) to add to (default this index)
+        returns: (1 value/s)
+            True if address (or tag of unsubscribe) wasn't in index
+        """
+        address = item["address"].lower()
+        with self._lock:
+            bounces, complaints, unsubscribes = index if index is not None else (self.bounces, self.complaints, self.unsubscribes)
+            if get_what in ("bounces", "complaints"):
+                addresses = bounces if get_what == "bounces" else complaints
+                added = address not in addresses
+                addresses.add(address)
+                return added
+            tags = unsubscribes.setdefault(address, set())
+            size = len(tags)
+            tags.update(item.get("tags") or ["*"])
+            return len(tags) > size
+    def refresh(self, api, domain="", full=False):
+        """
+        summary:
+            Downloads all suppressions and adds ones missing from index
+            (full=True - replaces index, drops removed suppressions)
+        params:
+            api - Api object
+            domain - domain name
+            full - rebuild index from scratch
+        returns: (1 value/s)
+            number of added items
+        raises:
+            MGApiException - if any of requests failed
+        """
+        # Full refresh fills new sets, current ones serve lookups meanwhile
+        index = (set(), set(), {}) if full else None
+        count = 0
+        for get_what in self._SUPRESSIONS:
+            for item in api.iter_supressions(get_what, domain=domain):
+                if self.add(get_what, item, index=index):
+                    count += 1
+        if full:
+            with self._lock:
+                self.bounces, self.complaints, self.unsubscribes = index
+        return count
+    def is_suppressed(self, address, tags=None):
+        """
+        summary:
+            Checks if address is bounced, complained or unsubscribed
+            (from all messages or from any of tags)
+        params:
+            address - email address
+            tags - tags of message (see o:tag)
+        returns: (1 value/s)
+            Bool
+        """
+        address = address.lower()
+        if address in self.bounces or address in self.complaints:
+            return True
+        unsubscribed_tags = self.unsubscribes.get(address)
+        if not unsubscribed_tags:
+            return False
+        return "*" in unsubscribed_tags or bool(tags and unsubscribed_tags.intersection(tags))
+# Response caching
+class MGApiResponseCache():
+    """
+        LRU cache of GET responses with TTL per endpoint family
+        (see MGApiUtils.ret_endpoint), families without TTL aren't cached.
+        Entries are kept in memory or, if path is set, in SQLite file
+        which can be shared by many processes.
+        Expired entries with ETag/Last-Modified are revalidated
+        with conditional request.
+        Keys include account (see ret_key), so cache file shared
+        by Api objects of different accounts doesn't mix their responses.
+        stats - hits, misses and revalidated (304) counters
+    """
+    def __init__(self, ttls, max_entries=1024, path=None):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.path = path
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0}
+        self.entries = OrderedDict()
+        self.connection = None
+        self._lock = threading.Lock()
+        if path is not None:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            with self.connection:
+                self.connection.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        expires REAL,
+                        accessed REAL,
+                        content BLOB,
+                        etag TEXT,
+                        last_modified TEXT
+                    )
+                """)
+    def ret_key(self, url, params, account=""):
+        """
+        summary:
+            Returns cache key of GET request
+        params:
+            account - account identifier (see MGApiRequests.ret_cache_account)
+        """
+        return "{prefix}?{params}".format(prefix=self.ret_key_prefix(url, account),
+                                          params=json.dumps(params, sort_keys=True, default=str))
+    def ret_key_prefix(self, url, account=""):
+        return "{account} {url}".format(account=account, url=url)
+    def get(self, key):
+        """
+        summary:
+            Returns entry (fresh or expired) or None
+        returns: (1 value/s)
+            dictionary {expires, content, etag, last_modified} or None
+        """
+        with self._lock:
+            if self.connection is None:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    self.entries.move_to_end(key)
+                return entry
+            row = self.connection.execute(
+                "SELECT expires, content, etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self.connection:
+                self.connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            return {"expires": row[0], "content": row[1], "etag": row[2], "last_modified": row[3]}
+    def set(self, key, ttl, content, etag=None, last_modified=None):
+        """
+        summary:
+            Stores response, evicts least recently used entries above max_entries
+        """
+        now = time.time()
+        entry = {"expires": now + ttl, "content": content, "etag": etag, "last_modified": last_modified}
+        with self._lock:
+            if self.connection is None:
+                self.entries[key] = entry
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                return
+            with self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, entry["expires"], now, content, etag, last_modified)
+                )
+                self.connection.execute(
+                    "DELETE FROM responses WHERE key NOT IN "
+                    "(SELECT key FROM responses ORDER BY accessed DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+    def invalidate(self, prefix):
+        """
+        summary:
+            Removes entries with keys starting with prefix (see ret_key_prefix)
+        """
+        with self._lock:
+            if self.connection is None:
+                for key in [key for key in self.entries if key.startswith(prefix)]:
+                    del self.entries[key]
+                return
+            with self.connection:
+                self.connection.execute("DELETE FROM responses WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            if self.connection is not None:
+                with self.connection:
+                    self.connection.execute("DELETE FROM responses")
+# Local event storage
+class MGApiEventStore():
+    """
+        SQLite store of events (see Api.store_events) indexed by
+        timestamp, event type, recipient, tag and message-id,
+        e.g:
+            with MGApiEventStore("events.sqlite3") as store:
+                api.store_events(store, begin=api.nowRFC2822(days=-30))
+                delivered = list(store.query(event="delivered", tag="MyTag"))
+    """
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS events (
+                    id TEXT PRIMARY KEY,
+                    timestamp REAL,
+                    event TEXT,
+                    recipient TEXT,
+                    message_id TEXT,
+                    data TEXT
+                );
+                CREATE TABLE IF NOT EXISTS event_tags (
+                    event_id TEXT,
+                    tag TEXT,
+                    PRIMARY KEY (tag, event_id)
+                );
+                CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp);
+                CREATE INDEX IF NOT EXISTS events_event ON events (event, timestamp);
+                CREATE INDEX IF NOT EXISTS events_recipient ON events (recipient, timestamp);
+                CREATE INDEX IF NOT EXISTS events_message_id ON events (message_id);
+            """)
+    def close(self):
+        self.connection.close()
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    def add_events(self, events):
+        """
+        summary:
+            Inserts events, events already in store (same id) are skipped
+        params:
+            events - iterable of events (api response items)
+        returns: (1 value/s)
+            number of inserted events
+        """
+        rows, tag_rows = [], []
+        for event in events:
+            message_id = event.get("message", {}).get("headers", {}).get("message-id")
+            rows.append((
+                event["id"], event["timestamp"], event.get("event"), event.get("recipient"),
+                message_id, json.dumps(event, separators=(",", ":"))
+            ))
+            tag_rows += [(event["id"], tag) for tag in event.get("tags") or []]
+        with self._lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany("INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?)", rows)
+            inserted = self.connection.total_changes - before
+            self.connection.executemany("INSERT OR IGNORE INTO event_tags VALUES (?, ?)", tag_rows)
+        return inserted
+    def ret_where(self, begin=None, end=None, event=None, recipient=None, tag=None, message_id=None):
+        """
+        summary:
+            Builds WHERE clause and its parameters (see query)
+        returns: (2 value/s)
+            where - sql
+            params - list of parameters
+        """
+        conditions, params = [], []
+        if begin is not None:
+            conditions.append("timestamp >= ?"); params.append(begin)
+        if end is not None:
+            conditions.append("timestamp <= ?"); params.append(end)
+        if event is not None:
+            conditions.append("event = ?"); params.append(event)
+        if recipient is not None:
+            conditions.append("recipient = ?"); params.append(recipient)
+        if message_id is not None:
+            conditions.append("message_id = ?"); params.append(message_id)
+        if tag is not None:
+            conditions.append("id IN (SELECT event_id FROM event_tags WHERE tag = ?)"); params.append(tag)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return where, params
+    def query(self, begin=None, end=None, event=None, recipient=None, tag=None, message_id=None,
+              ascending=True, limit=None):
+        """
+        summary:
+            Returns stored events matching all given filters
+        params:
+            begin, end - unix timestamps (inclusive)
+            event - event type (see _EVENTS)
+            recipient - recipient address
+            tag - tag name
+            message_id - message-id header
+            ascending - order by timestamp
+            limit - max number of events
+        returns: (1 value/s)
+            list of events
+        """
+        where, params = self.ret_where(begin, end, event, recipient, tag, message_id)
+        sql = "SELECT data FROM events{where} ORDER BY timestamp {order}".format(
+            where=where, order="ASC" if ascending else "DESC"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"; params.append(limit)
+        with self._lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    def count(self, begin=None, end=None, event=None, recipient=None, tag=None, message_id=None):
+        """
+        summary:
+            Returns number of stored events matching all given filters (see query)
+        """
+        where, params = self.ret_where(begin, end, event, recipient, tag, message_id)
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM events" + where, params).fetchone()[0]
+# Streaming exports
+class MGApiNDJSONWriter():
+    """
+        Writes json objects one per line as pages arrive (memory usage
+        doesn't depend on number of objects), optionally compressed,
+        e.g:
+            with MGApiNDJSONWriter("events.ndjson.gz") as writer:
+                for page in api.iter_events(chunked=True):
+                    writer.write_many(page)
+        Used by Api.export_events, export_members and export_supressions.
+    """
+    _EXTENSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+    def __init__(self, path, compression="auto", level=None, json_backend="json"):
+        """
+        params:
+            path - path of output file or writable binary file object (left open)
+            compression - {auto, gzip, zstd, None}, auto - by extension (.gz, .zst)
+            level - compression level (default gzip 6, zstd 3)
+            json_backend - {json, orjson} (see _JSON_BACKEND)
+        """
+        self.path = path
+        self.count = 0
+        if json_backend == "orjson" and orjson is None:
+            raise ImportError("_JSON_BACKEND 'orjson' requires orjson (pip install orjson)")
+        self.json_backend = json_backend
+        self.file, self._finish = self.open_file(path, compression, level)
+    @classmethod
+    def open_file(cls, path, compression="auto", level=None):
+        """
+        summary:
+            Opens binary (compressed) output
+        returns: (2 value/s)
+            file object and function which finishes output
+            (flushes compressed stream, closes file opened here)
+        """
+        if compression == "auto":
+            extension = os.path.splitext(path)[1] if isinstance(path, str) else ""
+            compression = cls._EXTENSIONS.get(extension)
+        if compression not in (None, "gzip", "zstd"):
+            raise ValueError("Unknown compression: {compression}".format(compression=compression))
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("MGApiNDJSONWriter compression 'zstd' requires zstandard (pip install zstandard)")
+        owned = isinstance(path, str)
+        target = open(path, "wb") if owned else path
+        if compression is None:
+            return target, target.close if owned else target.flush
+        if compression == "gzip":
+            # GzipFile.close leaves fileobj open
+            stream = gzip.GzipFile(fileobj=target, mode="wb", compresslevel=level if level is not None else 6)
+            end_stream = stream.close
+        else:
+            stream = zstandard.ZstdCompressor(level=level if level is not None else 3).stream_writer(target)
+            end_stream = lambda: stream.flush(zstandard.FLUSH_FRAME)
+
+        def finish():
+            end_stream()
+            if owned:
+                target.close()
+            else:
+                target.flush()
+
+        return stream, finish
+    def dumps(self, json_object):
+        if self.json_backend == "orjson":
+            return orjson.dumps(json_object, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(json_object, separators=(",", ":"), ensure_ascii=False).encode("utf8")
+    def write(self, json_object):
+        self.file.write(self.dumps(json_object) + b"\n")
+        self.count += 1
+    def write_many(self, json_objects):
+        """
+        summary:
+            Writes objects (e.g. page of items) with single write call
+        returns: (1 value/s)
+            number of written objects
+        """
+        lines = [self.dumps(json_object) + b"\n" for json_object in json_objects]
+        self.file.write(b"".join(lines))
+        self.count += len(lines)
+        return len(lines)
+    def close(self):
+        if self.file is not None:
+            self._finish()
+            self.file = None
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 # Config
 class MGApiConfiguration():
 
@@ -42,6 +1263,15 @@ class MGApiConfiguration():
         ### Debug configuration
         self._DEBUG = False
         self._DEBUG_SIGN = "[DEBUG]"
+        ### Logging configuration (see MGApiLogging, logger "mgapi")
+        # _LOG_MAX_VALUE_LENGTH : longer strings in logged payloads are truncated
+        # _LOG_MAX_ITEMS : longer lists/dictionaries in logged payloads are truncated
+        self._LOG_MAX_VALUE_LENGTH = 200
+        self._LOG_MAX_ITEMS = 20
+        # _LOG_REDACT : values of these payload keys are not logged
+        self._LOG_REDACT = ["html", "text", "amp-html", "private_key", "password", "attachment", "inline"]
+        # _LOG_SAMPLE_RATE : fraction of requests logged (1.0 - all)
+        self._LOG_SAMPLE_RATE = 1.0
         ### Api configuration
         #  _BASE_URL : https://documentation.mailgun.com/en/latest/api-intro.html#base-url
         self._BASE_URL    = "https://api.mailgun.net/v3"
@@ -55,6 +1285,44 @@ class MGApiConfiguration():
 
 
         self._REQUEST_TIMEOUT_SECONDS = 15
+        ### Rate limiting configuration (see MGApiRateLimiter)
+        # _RATE_LIMITS : requests per second by endpoint family
+        # {sending, events, stats, tags, lists, members, domains, supressions, default}
+        # or by (domain, family) tuple e.g: {("example.io", "sending"): 10},
+        # families without rate fall back to "default" (no rate - unlimited)
+        self._RATE_LIMITS = {
+        }
+        ### Response cache configuration (see Api.enable_cache)
+        # _CACHE_TTLS : seconds by endpoint family, families not listed aren't cached
+        self._CACHE_TTLS = {
+            "domains": 300,
+            "tags": 60,
+            "lists": 60,
+            "stats": 60
+        }
+        self._CACHE_MAX_ENTRIES = 1024
+        # _RATE_LIMIT_BURST : number of requests allowed at once above rate
+        self._RATE_LIMIT_BURST = 1
+        ### Retry configuration (see MGApiRetryPolicy)
+        # _RETRY_MAX_ATTEMPTS : max number of attempts (1 - no retries)
+        self._RETRY_MAX_ATTEMPTS  = 3
+        # _RETRY_BACKOFF_BASE / _RETRY_BACKOFF_CAP : backoff in seconds
+        self._RETRY_BACKOFF_BASE  = 0.5
+        self._RETRY_BACKOFF_CAP   = 30.0
+        self._RETRY_JITTER        = True
+        self._RETRY_STATUSES      = [429, 500, 502, 503, 504]
+        # _RETRY_METHODS : retried by default, others only with retry=True
+        self._RETRY_METHODS       = ["GET"]
+        ### Connection pool configuration
+        # _POOL_CONNECTIONS : number of per-host pools kept by the session
+        self._POOL_CONNECTIONS = 10
+        # _POOL_MAXSIZE : max keep-alive connections kept per host
+        self._POOL_MAXSIZE = 10
+        # _POOL_BLOCK : wait for a free connection instead of opening
+        # a throwaway one when all _POOL_MAXSIZE connections are busy
+        self._POOL_BLOCK = False
+        # _ASYNC_MAX_IN_FLIGHT : max concurrent requests of one AsyncApi object
+        self._ASYNC_MAX_IN_FLIGHT = 100
         self._EVENTS = [
             "accepted",
             "delivered",
@@ -70,6 +1338,20 @@ class MGApiConfiguration():
             "day",
             "month"
         ]
+        # Max number of recipients of single POST /<domain>/messages
+        # https://documentation.mailgun.com/en/latest/user_manual.html#batch-sending
+        self._MAX_RECIPIENTS_PER_MESSAGE = 1000
+        # Max number of members of single POST /lists/<address>/members.json
+        self._MAX_MEMBERS_PER_REQUEST = 1000
+        # Max number of items of single POST /<domain>/{bounces, unsubscribes, complaints}
+        # https://documentation.mailgun.com/en/latest/api-suppressions.html
+        self._MAX_SUPRESSIONS_PER_REQUEST = 1000
+        # Events younger than this are not settled yet (see Api.poll_events)
+        # https://documentation.mailgun.com/en/latest/api-events.html#event-polling
+        self._EVENTS_POLL_THRESHOLD_SECONDS = 1800
+        # _JSON_BACKEND : {json, orjson} parser and serializer of api responses
+        # (see MGApiUtils.deserialize_json), orjson is optional (pip install orjson)
+        self._JSON_BACKEND = "json"
         self._AGGREGATES = [
             "countries",
             "providers",
@@ -82,33 +1364,121 @@ class MGApiConfiguration():
         """
         print("[Mailgun API Client - Configuration]")
         print("Debug:", self._DEBUG)
+# Logged payload
+class MGApiLogPayload():
+    """
+        Payload (request params, POST data, ...) formatted only when log
+        record is emitted, with redacted keys and truncated values
+        (see _LOG_* in MGApiConfiguration class constructor)
+    """
+    def __init__(self, payload, redact=(), max_length=200, max_items=20, pretty=False):
+        self.payload = payload
+        self.redact = set(redact)
+        self.max_length = max_length
+        self.max_items = max_items
+        self.pretty = pretty
+    def ret_value(self, key, value):
+        if key in self.redact and value is not None:
+            return "<redacted {size} chars>".format(size=len(value)) if isinstance(value, (str, bytes)) else "<redacted>"
+        return self.ret_trimmed(value)
+    def ret_trimmed(self, value):
+        if isinstance(value, (str, bytes)) and len(value) > self.max_length:
+            return value[:self.max_length] + ("...({size} chars)".format(size=len(value)) if isinstance(value, str)
+                                              else "...({size} bytes)".format(size=len(value)).encode("utf8"))
+        if isinstance(value, dict):
+            ret = {key: self.ret_value(key, item) for key, item in itertools.islice(value.items(), self.max_items)}
+            if len(value) > self.max_items:
+                ret["..."] = "{more} more".format(more=len(value) - self.max_items)
+            return ret
+        if isinstance(value, (list, tuple)):
+            # (key, value) pairs e.g. AsyncApi request data
+            ret = [
+                (item[0], self.ret_value(item[0], item[1])) if isinstance(item, tuple) and len(item) == 2 and isinstance(item[0], str)
+                else self.ret_trimmed(item)
+                for item in value[:self.max_items]
+            ]
+            if len(value) > self.max_items:
+                ret.append("... {more} more".format(more=len(value) - self.max_items))
+            return ret
+        return value
+    def __str__(self):
+        value = self.ret_trimmed(self.payload)
+        if isinstance(value, str):
+            return value
+        return pp.pformat(value) if self.pretty else repr(value)
 # Logging and printing
 class MGApiLogging(MGApiConfiguration):
-    def printer_print(self, sign, *argv):
+    # Logger of this object, shared "mgapi" logger unless debug=True
+    # (see enable_debug_logging)
+    logger = logger
+
+    def enable_debug_logging(self, stream=None):
         """
-            Extended print
+        summary:
+            Prints debug records of this object (debug=True or _DEBUG == True)
+            through its own child of "mgapi" logger, level and handlers of
+            shared "mgapi" logger are left alone (configure logging to route
+            records of other objects)
+        params:
+            stream - output of debug records, default sys.stdout
+        """
+        debug_logger = logger.getChild("{name}.{id}".format(name=type(self).__name__, id=id(self)))
+        for handler in [handler for handler in debug_logger.handlers if getattr(handler, "mgapi_debug", False)]:
+            debug_logger.removeHandler(handler)
+        handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+        handler.setFormatter(logging.Formatter("[%(asctime)s] {sign} %(message)s".format(sign=self._DEBUG_SIGN)))
+        handler.mgapi_debug = True
+        debug_logger.addHandler(handler)
+        debug_logger.setLevel(logging.DEBUG)
+        # Printed once, not again by handlers of "mgapi" or root logger
+        debug_logger.propagate = False
+        self.logger = debug_logger
+
+    def ret_log_payload(self, payload, pretty=False):
+        """
+            Lazy redacted and truncated payload (see MGApiLogPayload)
+        """
+        return MGApiLogPayload(
+            payload,
+            redact=self._LOG_REDACT,
+            max_length=self._LOG_MAX_VALUE_LENGTH,
+            max_items=self._LOG_MAX_ITEMS,
+            pretty=pretty
+        )
+
+    def log_sampled(self):
         """
-        # print(time.asctime().split(" "))
-        # dayname, month, daynum, hour, year = time.asctime().split(" ")
-        # to_print_time = " ".join([dayname, month, year, daynum, hour])
-        print("[%s]" % time.asctime(), sign, end=" ")
-        for e in argv:
-            print(e, end=" ")
-        print("")
+            Debug logging is on and this request is sampled (_LOG_SAMPLE_RATE)
+        """
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return False
+        return self._LOG_SAMPLE_RATE >= 1.0 or random.random() < self._LOG_SAMPLE_RATE
+
+    def log_request(self, caller, method, url, request_params):
+        """
+            Logs request (sampled), params are formatted only if record is emitted
+        """
+        if self.log_sampled():
+            self.logger.debug("%s %s %s %s", caller, method, url, self.ret_log_payload(request_params))
 
     def print_debug(self, *argv):
         """
-            Print if in debug mode ( _DEBUG == True )
+            Log debug record (self.logger), values are formatted lazily
         """
-        if self._DEBUG: self.printer_print("[DEBUG]", *argv)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(" ".join(["%s"] * len(argv)), *[self.ret_log_payload(value) for value in argv])
 
     def print_debug_pretty(self, obj):
         """
-            Print ( use pprint.pprint ) if in debug mode ( _DEBUG == True )
+            Log debug record (self.logger) with pretty printed obj ( pprint.pformat )
         """
-        if self._DEBUG: pp.pprint(obj)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s", self.ret_log_payload(obj, pretty=True))
 # Helper methods
 class MGApiUtils(MGApiLogging):
+    # Start of paginated response, group 1 matches if there are no items (see ret_raw_paging)
+    _RAW_ITEMS = re.compile(rb'\s*\{\s*"items"\s*:\s*\[(\s*\])?')
+
     # Justification methods
     def justify(self, json_object, msg, success=True, reason=""):
         """
@@ -139,7 +1509,7 @@ class MGApiUtils(MGApiLogging):
                 reason - reason of error
                 success - indicator of success or failure
             returns: (2 value/s)
-                deserialized and serialized json
+                deserialized and serialized json (MGApiResponse)
                     or
                 False ,False
         """
@@ -151,186 +1521,2345 @@ class MGApiUtils(MGApiLogging):
                 success=success,
                 reason=reason
             )
-            return deserialized, self.serialize_json(deserialized)
+            return MGApiResponse(deserialized, serialize_function=self.serialize_json)
         return False, False
-    # JSON parsing methods
-    def serialize_json(self, json_object, sort_keys=True, indent=4, separators=(',', ': ')):
+    def check_pages(self, deserialized_response):
         """
-        docs:
-            https://docs.python.org/3/library/json.html
         summary:
-            Returns serialized json (api response)
-        params:
-            json_object  - json api response
-            sort_keys    - json.dumps param (see documentation)
-            indent       - json.dumps param (see documentation)
-            separators   - json.dumps param (see documentation)
-        returns: (1 value/s)
-            serialized json (api response)
+            Checks that successful response can be iterated page by page
+            (see Api.iter_pages), failed responses are left to iterator
+        raises:
+            ValueError - if response has no 'items' (e.g. raw=True response)
         """
-        return json.dumps(json_object, sort_keys=sort_keys, indent=indent, separators=separators)
-    def deserialize_json(self, json_string):
+        if deserialized_response["justify"]["success"] and "items" not in deserialized_response:
+            raise ValueError("Only responses with 'items' can be iterated, "
+                             "follow raw (raw=True) responses with follow_pagination(raw=True)")
+    # Configuration
+    def read_config(self, domain="", api_user="", private_key="", base_url="", config_file=None):
         """
-        docs:
-            https://docs.python.org/3/library/json.html
         summary:
-            Returns deserialized json (api response)
+            Sets domain, api_user, private_key and base_url from parameters
+            (or MGApiConfiguration class) or from json config file
         params:
-            json_string - json string (api response)
-        returns: (1 value/s)
-            deserialized json (api response)
-        """
-        if not isinstance(json_string, str) and not isinstance(json_string, bytes):
-            print("implement this: helpers deserialize_json method")
-        if isinstance(json_string, bytes):
-            json_string = str(json_string, "utf8") if isinstance(json_string, bytes) else string
-        return json.loads(json_string)
-    def to_json(self, json_string):
+            domain, api_user, private_key, base_url - (see Api constructor)
+            config_file - path of json config file (see config_example.json)
         """
-        docs:
-            https://docs.python.org/3/library/json.html
-        summary:
-            Returns serialized and deserialized json_string (api response).
-            Adds justification to response.
-            justification is always success=True with appropriate message
+        if self._DEBUG:
+            self.enable_debug_logging()
+            self.logger.debug("[DEBUG MODE IS ON] - you can change it in MGApiConfiguration class constructor")
 
-            DON'T use this method for deserialization and serialization
-            of json object/json string instead use together:
-                serialize_json method
-                    and
-                deserialize_json method
-        params:
-            json_string - api response
-        returns: (2 value/s)
-            Serialized and deserialized json (api response)
-        """
+        # Config from parameters or config class
+        if config_file is None:
+            self.base_url    = base_url    if base_url    else self._BASE_URL
+            self.domain      = domain      if domain      else self._DOMAIN
+            self.private_key = private_key if private_key else self._PRIVATE_KEY
+            self.api_user    = api_user    if api_user    else self._API_USER
+        else:
+        # Config from config file
+            self.print_debug("Reading config file")
+            try:
+                with open(config_file, "rb") as config_content:
+                    config_json_serialized = config_content.read()
+            except FileNotFoundError as e:
+                print("FileNotFoundError: {exception}".format(exception=e))
+                exit(0)
+            except Exceptions as e:
+                print("Unhandled exception: {exception}".format(exception=e))
+                exit(0)
+            config_json_deserialized = self.deserialize_json(config_json_serialized)
+            self.print_debug("Config file JSON")
+            self.print_debug_pretty(config_json_deserialized)
+            self.api_user    = config_json_deserialized["api_user"]    if "api_user"    in config_json_deserialized.keys() else ""
+            self.domain      = config_json_deserialized["domain"]      if "domain"      in config_json_deserialized.keys() else ""
+            self.private_key = config_json_deserialized["private_key"] if "private_key" in config_json_deserialized.keys() else ""
+            self.base_url    = config_json_deserialized["base_url"]    if "base_url"    in config_json_deserialized.keys() else ""
+    # Endpoints
+    def ret_endpoint(self, url):
+        """
+        summary:
+            Returns domain and endpoint family of url
+            e.g: <base_url>/example.io/events/<page> -> ("example.io", "events")
+        params:
+            url - URL of the api endpoint
+        returns: (2 value/s)
+            domain - domain name (None for /domains and /lists)
+            family - {sending, events, stats, tags, lists, members, domains, supressions, default}
+        """
+        path = urlparse(url).path
+        base_path = urlparse(self.base_url).path.rstrip("/")
+        if base_path and path.startswith(base_path + "/"):
+            path = path[len(base_path):]
+        parts = [part for part in path.split("/") if part]
+        if not parts:
+            return None, "default"
+        if parts[0] == "lists" and len(parts) > 2 and parts[2] in ("members", "members.json"):
+            return None, "members"
+        if parts[0] in ("domains", "lists"):
+            return None, parts[0]
+        domain, rest = parts[0], parts[1:]
+        if not rest:
+            return domain, "default"
+        if rest[0] in ("messages", "messages.mime"):
+            return domain, "sending"
+        if rest[0] == "events":
+            return domain, "events"
+        if "stats" in rest:
+            return domain, "stats"
+        if rest[0] == "tags":
+            return domain, "tags"
+        if rest[0] in ("bounces", "unsubscribes", "complaints"):
+            return domain, "supressions"
+        return domain, "default"
+    # Endpoint requests (shared by Api and AsyncApi)
+    def ret_validation_error(self, caller, event=None, resolution=None, aggregate=None):
+        """
+        summary:
+            Validates event, resolution and aggregate names (those that are set)
+        params:
+            caller - caller method
+        returns: (2 value/s)
+            deserialized and serialized json (MGApiResponse)
+                or
+            False ,False
+        """
+        checks = [
+            (event, self._EVENTS, "Event name is not valid: {value}"),
+            (resolution, self._RESOLUTIONS, "Resolution is not valid: {value}"),
+            (aggregate, self._AGGREGATES, "Aggregate name is not valid: {value}")
+        ]
+        for value, valid, reason in checks:
+            if value is None:
+                continue
+            response = self.not_in_justify(
+                value,
+                valid,
+                caller=caller,
+                reason=reason.format(value=value),
+                success=False
+            )
+            if response[0]:
+                return response
+        return False, False
+    def ret_domains_request(self, domain="", limit=100, skip=0):
+        """
+            GET /domains/<domain>
+            GET /domains
+        returns: (2 value/s)
+            url and params
+        """
+        url = "{base_url}/domains".format(base_url=self.base_url)
+        if domain:
+            url = "{url}/{domain}".format(url=url, domain=domain)
+        # Optional prameters
+        params = {"limit": limit, "skip": skip}
+        return url, params
+    def ret_supressions_request(self, get_what, address="", domain="", limit=100):
+        """
+            GET /<domain>/<get_what>
+            GET /<domain>/<get_what>/<address>
+        returns: (2 value/s)
+            url and params
+        """
+        # Set default if invalid limit value
+        if limit < 0 or limit > 10000: limit = 100;
+        # If domain is set use it else use domain from constructor
+        cp_domain = domain if domain else self.domain
+        url = "{base_url}/{domain}/{get_what}".format(base_url=self.base_url, domain=cp_domain, get_what=get_what)
+        if address:
+            url = "{url}/{address}".format(url=url, address=address)
+        # Optional prameters
+        params = {"limit": limit}
+        return url, params
+    def ret_lists_request(self, address="", limit=100):
+        """
+            GET /lists/<address>
+            GET /lists/pages
+        returns: (2 value/s)
+            url and params
+        """
+        url = "{base_url}/lists".format(base_url=self.base_url)
+        url = "{url}/{address}".format(url=url, address=address) if address else "{url}/pages".format(url=url)
+        # Optional prameters
+        params = {"limit": limit}
+        return url, params
+    def ret_add_list_request(self, address, name="", description="", access_level="readonly"):
+        """
+            POST /lists
+        returns: (2 value/s)
+            url and data
+        """
+        url = "{base_url}/lists".format(base_url=self.base_url)
+        data = {
+            "address": address,
+            "name": name,
+            "description": description,
+            "access_level": access_level
+        }
+        return url, data
+    def ret_members_request(self, address, member_address="", limit=100, subscribed=None):
+        """
+            GET /lists/<address>/members/<member_address>
+            GET /lists/<address>/members/pages
+        returns: (2 value/s)
+            url and params
+        """
+        url = "{base_url}/lists/{address}/members".format(base_url=self.base_url, address=address)
+        url = "{url}/{member_address}".format(url=url, member_address=member_address) if member_address else "{url}/pages".format(url=url)
+        # Optional prameters
+        params = {"limit": limit}
+        if subscribed is not None:
+            params["subscribed"] = subscribed
+        return url, params
+    def ret_bulk_add_members_request(self, address, members, upsert="no"):
+        """
+            POST /lists/<address>/members.json
+        returns: (2 value/s)
+            url and data
+        """
+        url = "{base_url}/lists/{address}/members.json".format(base_url=self.base_url, address=address)
+        # Compact json, payload is limited
+        members_json_string = self.serialize_json(members, sort_keys=False, indent=None, separators=(",", ":"))
+        data = {
+            "members": members_json_string,
+            "upsert": upsert
+        }
+        return url, data
+    def ret_events_request(self, domain="", begin="", end="", ascending="yes", limit=300, filter_fields={}):
+        """
+            GET /<domain>/events
+        returns: (2 value/s)
+            url and params
+        """
+        limit = 100 if limit<0 or limit>300 else limit
+        # If domain is set use it else use domain from constructor
+        cp_domain = domain if domain else self.domain
+        url = "{base_url}/{domain}/events".format(base_url=self.base_url, domain=cp_domain)
+        # Optional prameters
+        params = {
+            "limit": limit
+        }
+        # 0 (epoch) is valid begin/end
+        if begin not in ("", None): params["begin"] = begin;
+        if end not in ("", None):   params["end"] = end;
+        if ascending: params["ascending"] = ascending;
+        for key, value in filter_fields.items():
+            if value is not None: params[key] = value;
+        return url, params
+    def ret_stats_total_request(self, event, domain="", start="", end="", resolution="day", duration=""):
+        """
+            GET /<domain>/stats/total
+            (validate event and resolution with ret_validation_error)
+        returns: (2 value/s)
+            url and params
+        """
+        # If domain is set use it else use domain from constructor
+        cp_domain = domain if domain else self.domain
+        params = {
+            "event": event,
+            "resolution": resolution
+        }
+        if start:    params["start"]    = start;
+        if end:      params["end"]      = end;
+        if duration: params["duration"] = duration;
+        url = "{base_url}/{domain}/stats/total".format(base_url=self.base_url, domain=cp_domain)
+        return url, params
+    def ret_tags_request(self, domain="", tag="", limit=100):
+        """
+            GET /<domain>/tags
+            GET /<domain>/tags/<tag>
+        returns: (2 value/s)
+            url and params
+        """
+        cp_domain = domain if domain else self.domain
+        url = "{base_url}/{domain}/tags".format(base_url=self.base_url, domain=cp_domain)
+        url = "{url}/{tag}".format(url=url, tag=tag) if tag else url
+        params = {
+            "limit": limit
+        }
+        return url, params
+    def ret_tag_stats_request(self, tag, event, domain="", start="", end="", resolution="day", duration=""):
+        """
+            GET /<domain>/tags/<tag>/stats
+            (validate event and resolution with ret_validation_error)
+        returns: (2 value/s)
+            url and params
+        """
+        cp_domain = domain if domain else self.domain
+        url = "{base_url}/{domain}/tags/{tag}/stats".format(base_url=self.base_url, domain=cp_domain, tag=tag)
+        params = {
+            "event": event,
+            "resolution": resolution
+        }
+        if start:    params["start"]    = start;
+        if end:      params["end"]      = end;
+        if duration: params["duration"] = duration;
+        return url, params
+    def ret_tag_aggregates_request(self, tag, aggregate, domain=""):
+        """
+            GET /<domain>/tags/<tag>/stats/aggregates/<aggregate>
+            (validate aggregate with ret_validation_error)
+        returns: (2 value/s)
+            url and params
+        """
+        cp_domain = domain if domain else self.domain
+        url = "{base_url}/{domain}/tags/{tag}/stats/aggregates/{aggregate}".format(
+            base_url=self.base_url,
+            domain=cp_domain,
+            tag=tag,
+            aggregate=aggregate
+        )
+        params = {
+        }
+        return url, params
+    def ret_message_request(self, From, to, subject, html, text, domain="", additional_sending_options=None):
+        """
+            POST /<domain>/messages
+        returns: (2 value/s)
+            url and data
+        """
+        # If domain is set use it else use domain from constructor
+        cp_domain = domain if domain else self.domain
+        # Set default additional_sending_options if not set by user
+        if additional_sending_options is None:
+            additional_sending_options = self.ret_additional_sending_options()
+        data = {
+            "from": From, "to": to,
+            "subject": subject, "html": html, "text": text
+        }
+        for key, value in additional_sending_options.items():
+            if value is not None:
+                data[key] = value
+        url = "{base_url}/{domain}/messages".format(base_url=self.base_url, domain=cp_domain)
+        return url, data
+    # JSON parsing methods
+    def serialize_json(self, json_object, sort_keys=True, indent=4, separators=(',', ': ')):
+        """
+        docs:
+            https://docs.python.org/3/library/json.html
+        summary:
+            Returns serialized json (api response)
+        params:
+            json_object  - json api response
+            sort_keys    - json.dumps param (see documentation)
+            indent       - json.dumps param (see documentation), orjson backend
+                           always indents by 2 spaces (any indent but None)
+            separators   - json.dumps param (see documentation), ignored by
+                           orjson backend
+        returns: (1 value/s)
+            serialized json (api response), output of json and orjson
+            backends differs in whitespace
+        """
+        if self._JSON_BACKEND == "orjson":
+            if orjson is None:
+                raise ImportError("_JSON_BACKEND 'orjson' requires orjson (pip install orjson)")
+            # orjson indents by 2 spaces only, separators are fixed
+            option = orjson.OPT_NON_STR_KEYS
+            option |= orjson.OPT_SORT_KEYS if sort_keys else 0
+            option |= orjson.OPT_INDENT_2 if indent else 0
+            return orjson.dumps(json_object, option=option).decode("utf8")
+        return json.dumps(json_object, sort_keys=sort_keys, indent=indent, separators=separators)
+    def deserialize_json(self, json_string):
+        """
+        docs:
+            https://docs.python.org/3/library/json.html
+        summary:
+            Returns deserialized json (api response)
+        params:
+            json_string - json string (api response) str, bytes or memoryview
+        returns: (1 value/s)
+            deserialized json (api response)
+        """
+        if self._JSON_BACKEND == "orjson":
+            if orjson is None:
+                raise ImportError("_JSON_BACKEND 'orjson' requires orjson (pip install orjson)")
+            # Parses bytes and memoryview without decoding to str first
+            return orjson.loads(json_string)
+        # json.loads takes str or bytes only (memoryview is copied) and decodes
+        # bytes to str itself, so bytes are no faster than str here
+        if isinstance(json_string, memoryview):
+            json_string = json_string.tobytes()
+        return json.loads(json_string)
+    def to_json(self, json_string):
+        """
+        docs:
+            https://docs.python.org/3/library/json.html
+        summary:
+            Returns serialized and deserialized json_string (api response).
+            Adds justification to response.
+            justification is always success=True with appropriate message
+            Serialized json is built when unpacked or accessed (see MGApiResponse).
+
+            DON'T use this method for deserialization and serialization
+            of json object/json string instead use together:
+                serialize_json method
+                    and
+                deserialize_json method
+        params:
+            json_string - api response
+        returns: (2 value/s)
+            Serialized and deserialized json (api response), MGApiResponse
+        """
         deserialized = self.deserialize_json(json_string=json_string)
         # Add justification.
         deserialized = self.justify(deserialized, "Operation succeeded.")
-        serialized   = self.serialize_json(deserialized)
-        return deserialized, serialized
-    # Options modifiers methods (Sending)
-    def options_add_header(self, options, header, value):
+        return MGApiResponse(deserialized, serialize_function=self.serialize_json)
+    def to_raw(self, content):
+        """
+        summary:
+            Returns justification and undecoded response body (raw mode).
+            Only 'paging' object is parsed so pagination can be followed
+            (see ret_raw_paging).
+        params:
+            content - api response (bytes)
+        returns: (2 value/s)
+            deserialized - justification, 'paging' and 'empty' (no items)
+                           keys if response is paginated
+            serialized - memoryview of response body
+        """
+        deserialized = {}
+        paging, empty = self.ret_raw_paging(content)
+        if paging is not None:
+            deserialized["paging"], deserialized["empty"] = paging, empty
+        deserialized = self.justify(deserialized, "Operation succeeded.")
+        return MGApiResponse(deserialized, serialized=memoryview(content))
+    def ret_body_size(self, body):
+        """
+        params:
+            body - str, bytes or list of (key, value) pairs (form sent by
+                   AsyncApi, see MGApiAsyncRequests.ret_request_pairs)
+        returns: (1 value/s)
+            size of request body in bytes (0 if unknown or streamed)
+        """
+        if isinstance(body, list):
+            # aiohttp urlencodes pairs the same way
+            return len(urlencode(body).encode("utf8"))
+        if isinstance(body, str):
+            return len(body.encode("utf8"))
+        if isinstance(body, (bytes, bytearray)):
+            return len(body)
+        return 0
+    def ret_raw_paging(self, content):
+        """
+        summary:
+            Reads 'paging' object (last key of paginated responses) and checks
+            if 'items' (first key) is empty without parsing whole response.
+            Whole response is parsed only if keys are in other order.
+        params:
+            content - api response (bytes)
+        returns: (2 value/s)
+            paging - dictionary or None (response isn't paginated)
+            empty - page has no items (None if response isn't paginated)
+        """
+        position = content.rfind(b'"paging"')
+        if position < 0:
+            return None, None
+        items = self._RAW_ITEMS.match(content)
+        try:
+            paging = self.deserialize_json(b"{" + content[position:])["paging"]
+        except (ValueError, KeyError):
+            paging = None
+        if paging is None or items is None:
+            deserialized = self.deserialize_json(content)
+            return deserialized.get("paging"), len(deserialized.get("items", [])) == 0
+        return paging, items.group(1) is not None
+    # Stats
+    def flatten_stats(self, stats_item, prefix=""):
+        """
+        summary:
+            Flattens nested counters of stats item
+            e.g: {"failed": {"permanent": {"bounce": 1}}} -> {"failed.permanent.bounce": 1}
+        params:
+            stats_item - single item of 'stats' list (api response)
+            prefix - prefix of keys
+        returns: (1 value/s)
+            dictionary {counter path: value} ('time' key is skipped)
+        """
+        ret = {}
+        for key, value in stats_item.items():
+            if not prefix and key == "time":
+                continue
+            path = "{prefix}.{key}".format(prefix=prefix, key=key) if prefix else key
+            if isinstance(value, dict):
+                ret.update(self.flatten_stats(value, prefix=path))
+            else:
+                ret[path] = value
+        return ret
+    def ret_stats(self, *responses):
+        """
+        summary:
+            Converts get_stats_total/get_tag_stats responses (e.g. one per event)
+            into MGApiStats (contiguous numpy arrays)
+        params:
+            responses - deserialized json (api responses) of the same resolution
+        returns: (1 value/s)
+            MGApiStats object
+        """
+        rows = {}
+        for deserialized in responses:
+            for item in deserialized["stats"]:
+                timestamp = utils.parsedate_to_datetime(item["time"]).timestamp()
+                rows.setdefault(timestamp, {}).update(self.flatten_stats(item))
+        time_axis = sorted(rows)
+        names = sorted(set(name for row in rows.values() for name in row))
+        values = [[rows[timestamp].get(name, 0) for timestamp in time_axis] for name in names]
+        resolution = responses[0].get("resolution", "day") if responses else "day"
+        return MGApiStats(time_axis, names, values, resolution=resolution, resolutions=self._RESOLUTIONS)
+    # Options modifiers methods (Sending)
+    def options_add_header(self, options, header, value):
+        """
+        docs:
+            https://documentation.mailgun.com/en/latest/api-sending.html#sending
+        summary:
+            adds new element to options dictionary
+        params:
+            options - dictionary
+            header - key
+            value - value
+        returns: (1 value/s)
+            dictionary (options param) with added new element
+        """
+        options["h:{header}".format(header=header)] = value
+        return options
+    def options_add_variable(self, options, variable, value):
+        """
+        docs:
+            https://documentation.mailgun.com/en/latest/api-sending.html#sending
+        summary:
+            adds new element to options dictionary
+        params:
+            options - dictionary
+            header - key
+            value - value
+        returns: (1 value/s)
+            dictionary (variable param) with added new element
+        """
+        options["v:{variable}".format(variable=variable)] = value
+        return options
+    # Time
+    def ret_timestamp(self, value):
+        """
+        summary:
+            Converts begin/end value to unix timestamp
+        params:
+            value - unix timestamp (int, float or numeric string),
+                    datetime.datetime (naive is local time) or RFC2822 string
+        returns: (1 value/s)
+            unix timestamp (float)
+        """
+        if isinstance(value, datetime.datetime):
+            return value.timestamp()
+        if isinstance(value, (int, float)):
+            return float(value)
+        try:
+            return float(value)
+        except ValueError:
+            return MGApiTimestamps.parse_rfc2822(value)
+    def nowRFC2822(self, days=0, hours=0, minutes=0, return_timestamp=False):
+        """
+        docs:
+            https://documentation.mailgun.com/en/latest/api-sending.html#sending
+        summary:
+            Current time (shifted) as RFC2822 datetime in local timezone
+            (formatted strings are cached, see MGApiTimestamps.rfc2822)
+        params:
+            days - [integer] number of days
+            hours - [integer] number of hours
+            minutes - [integer] number of minutes
+            return_timestamp - Bool
+        returns: (1 value/s or 2 value/s)
+            RFC2822 datetime
+                or
+            RFC2822 datetime and it's timestamp
+        """
+        timedelta_shift = datetime.timedelta(days=days, hours=hours, minutes=minutes)
+        now_timestamp = int(time.time() + timedelta_shift.total_seconds())
+        result = MGApiTimestamps.rfc2822(now_timestamp)
+        self.print_debug("timedelta_shift:", timedelta_shift)
+        self.print_debug("now_timestamp:", now_timestamp)
+        self.print_debug("result:", result)
+        if return_timestamp:
+            return result, now_timestamp
+        return result
+    @staticmethod
+    def toRFC2822(_datetime, days=0, hours=0, minutes=0, return_timestamp=False):
+        """
+        summary:
+            datetime.datetime (shifted) as RFC2822 datetime in local timezone
+        params:
+            _datetime - datetime.datetime (naive is local time)
+            (rest see nowRFC2822)
+        returns: (1 value/s or 2 value/s)
+            RFC2822 datetime
+                or
+            RFC2822 datetime and it's timestamp
+        """
+        timedelta_shift = datetime.timedelta(days=days, hours=hours, minutes=minutes)
+        now_timestamp = int((_datetime + timedelta_shift).timestamp())
+        result = MGApiTimestamps.rfc2822(now_timestamp)
+        if return_timestamp:
+            return result, now_timestamp
+        return result
+    @staticmethod
+    def ISO8601(iso8601_string, aware=False):
+        """
+        summary:
+            Parses ISO8601 string (for columns see MGApiTimestamps.from_iso8601)
+        params:
+            aware - False: naive UTC datetime without microseconds ("Z"/+hh:mm
+                    offset is applied, string without offset is UTC),
+                    True: datetime with offset kept as tzinfo
+        returns: (1 value/s)
+            datetime.datetime
+                or
+            False if string isn't ISO8601 datetime
+        """
+        try:
+            if iso8601_string.endswith("Z"):
+                iso8601_string = iso8601_string[:-1] + "+00:00"
+            result = datetime.datetime.fromisoformat(iso8601_string)
+        except (AttributeError, TypeError, ValueError):
+            return False
+        if aware:
+            return result
+        if result.tzinfo is not None:
+            result = result.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return result.replace(microsecond=0)
+# Unification of request responses
+class MGApiRequests(MGApiUtils):
+
+    # Session
+    def new_session(self):
+        """
+        docs:
+            http://docs.python-requests.org/en/master/user/advanced/#session-objects
+        summary:
+            Creates pooled keep-alive session
+            (see _POOL_* in MGApiConfiguration class constructor)
+        returns: (1 value/s)
+            requests.Session object
+        """
+        adapter = HTTPAdapter(
+            pool_connections=self._POOL_CONNECTIONS,
+            pool_maxsize=self._POOL_MAXSIZE,
+            pool_block=self._POOL_BLOCK
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    def open_session(self):
+        """
+        summary:
+            Opens session shared by all endpoint methods.
+            Closes previously opened session (if any).
+        returns: (1 value/s)
+            requests.Session object
+        """
+        session = self.new_session()
+        with self._session_lock:
+            old_session, self.session = self.session, session
+        if old_session is not None:
+            old_session.close()
+        return session
+    def ret_session(self):
+        """
+        summary:
+            Returns current session, opens new one if it was closed
+        returns: (1 value/s)
+            requests.Session object
+        """
+        session = self.session
+        if session is None:
+            with self._session_lock:
+                if self.session is None:
+                    self.session = self.new_session()
+                session = self.session
+        return session
+    def close(self):
+        """
+        summary:
+            Closes session and all pooled connections.
+            Safe to call more than once, next request opens new session.
+        """
+        with self._session_lock:
+            session, self.session = self.session, None
+        if session is not None:
+            session.close()
+    def __enter__(self):
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # RequestExtended
+    def requestEx(self, url, request_function, request_params, method="GET", retry=None):
+        """
+        summary:
+            requests.request but with overkill exceptions and
+            option of choosing type of request.
+            Failed requests are retried according to self.retry_policy
+        params:
+            url - URL of the api endpoint
+            request_function - method from one below:
+                                    self.get
+                                    self.post
+                                    self.put
+            request_params - parameters of chosen 'request_function'
+            method - {GET, POST, PUT, DELETE}
+            retry - True/False force/disable retries, None - retry_policy decides by method
+        returns: (3 value/s)
+            reason - reason for exception
+            success - indicator of success (Bool)
+            result - result of request
+        """
+        timeout = self._REQUEST_TIMEOUT_SECONDS
+        request_params_common = {
+            "auth": (self.api_user, self.private_key),
+            "timeout": timeout
+        }
+        request_params = {**request_params, **request_params_common}
+
+        reason = None
+        success = None
+        result = None
+
+        endpoint = self.ret_endpoint(url)
+        attempt, first_failure = 0, None
+        metrics = self.metrics
+        if metrics is not None:
+            start, started = time.time(), time.perf_counter()
+        while True:
+            retryable = False
+            response = None
+            try:
+                self.rate_limiter.acquire(endpoint)
+                result = response = request_function(url, **request_params)
+                self.rate_limiter.feedback(endpoint, result.status_code, result.headers.get("Retry-After"))
+                if result.status_code == 304:
+                    # Not Modified, response to conditional request (see MGApiRequests.get)
+                    reason, success, result = None, True, result
+                elif result.status_code != 200:
+                    retryable = result.status_code in self.retry_policy.retry_statuses
+                    deserialized_content = self.deserialize_json(result.content)
+                    reason = "Status code:{status_code} | Message:{message} | Content:{content}".format(
+                        status_code=result.status_code,
+                        message=deserialized_content["message"] if "message" in deserialized_content.keys() else "KeyError",
+                        content=result.content
+                    )
+                    success, result = False, None
+                else:
+                    # operation succeeded
+                    reason, success, result = None, True, result
+            except Timeout as e:
+                retryable = True
+                reason, success, result = "Timeout: {exception}".format(exception=e), False, None
+            except ConnectionError as e:
+                retryable = True
+                reason, success, result = "ConnectionError: {exception}".format(exception=e), False, None
+            except Exception as e:
+                reason, success, result = "Unhandled Exception: {exception}".format(exception=e), False, None
+            if not retryable or not self.retry_policy.should_retry(method, attempt, retry=retry):
+                break
+            if first_failure is None:
+                first_failure = time.perf_counter()
+            time.sleep(self.retry_policy.ret_delay(attempt))
+            attempt += 1
+
+        self.retry_policy.record(attempt, time.perf_counter() - first_failure if first_failure else 0.0)
+        if metrics is not None:
+            metrics.record_request(
+                method, url, endpoint, start, time.perf_counter() - started,
+                status=response.status_code if response is not None else None,
+                bytes_sent=self.ret_body_size(response.request.body) if response is not None else 0,
+                bytes_received=len(response.content) if response is not None else 0,
+                retries=attempt,
+                reason=reason
+            )
+        return reason, success, result
+
+    # Requests
+    def get(self, url, params={}, retry=None, **kwargs):
+        """
+        docs:
+            http://docs.python-requests.org/en/master/
+        summary:
+            Method used as requestEx method's parameter
+        params:
+            url - URL of the api endpoint
+            params - GET parameters
+            retry - True/False force/disable retries (see MGApiRetryPolicy)
+        returns: (3 value/s)
+            reason - reason for exception
+            success - indicator of success (Bool)
+            result - result of request
+        """
+        request_function = self.ret_session().get
+        request_params = {
+            "params": params,
+            **kwargs
+        }
+        self.log_request("MGApiRequests.get", "GET", url, request_params)
+        ttl = self.cache.ttls.get(self.ret_endpoint(url)[1]) if self.cache is not None else None
+        if not ttl:
+            reason, success, result = self.requestEx(url, request_function, request_params, method="GET", retry=retry)
+            return reason, success, result
+
+        # Cached
+        key = self.cache.ret_key(url, params, account=self.ret_cache_account())
+        entry = self.cache.get(key)
+        if entry is not None and entry["expires"] > time.time():
+            self.cache.count("hits")
+            return None, True, MGApiResult(200, entry["content"])
+        self.cache.count("misses")
+        if entry is not None and (entry["etag"] or entry["last_modified"]):
+            headers = dict(request_params.get("headers") or {})
+            if entry["etag"]:          headers["If-None-Match"]     = entry["etag"];
+            if entry["last_modified"]: headers["If-Modified-Since"] = entry["last_modified"];
+            request_params["headers"] = headers
+        reason, success, result = self.requestEx(url, request_function, request_params, method="GET", retry=retry)
+        if success and result.status_code == 304:
+            self.cache.count("revalidated")
+            self.cache.set(key, ttl, entry["content"], entry["etag"], entry["last_modified"])
+            return reason, success, MGApiResult(200, entry["content"])
+        if success:
+            self.cache.set(key, ttl, result.content, result.headers.get("ETag"), result.headers.get("Last-Modified"))
+        return reason, success, result
+    def ret_cache_account(self):
+        """
+        summary:
+            Returns account part of cache keys: api_user and hash of private_key
+        """
+        key_hash = hashlib.sha256(self.private_key.encode("utf8")).hexdigest()[:16]
+        return "{api_user}:{key_hash}".format(api_user=self.api_user, key_hash=key_hash)
+    def invalidate_cache(self, url):
+        """
+        summary:
+            Drops cached responses of mailing list changed by write request
+            to url (the list, its members and /lists/pages)
+        params:
+            url - URL of write (POST, PUT, DELETE) request
+        """
+        if self.cache is None or self.ret_endpoint(url)[1] not in ("lists", "members"):
+            return
+        lists_url = "{base_url}/lists".format(base_url=self.base_url)
+        address = urlparse(url).path.split("/lists", 1)[-1].strip("/").split("/")[0]
+        account = self.ret_cache_account()
+        self.cache.invalidate(self.cache.ret_key_prefix("{lists_url}/pages".format(lists_url=lists_url), account))
+        self.cache.invalidate(self.cache.ret_key_prefix("{lists_url}/{address}".format(lists_url=lists_url, address=address), account))
+    def post(self, url, data={}, retry=None, **kwargs):
+        """
+        docs:
+            http://docs.python-requests.org/en/master/
+        summary:
+            Method used as requestEx method's parameter
+        params:
+            url - URL of the api endpoint
+            data - POST data
+            retry - True/False force/disable retries (see MGApiRetryPolicy)
+        returns: (3 value/s)
+            reason - reason for exception
+            success - indicator of success (Bool)
+            result - result of request
+        """
+        request_function = self.ret_session().post
+        request_params = {
+            "data": data,
+            **kwargs
+        }
+        self.log_request("MGApiRequests.post", "POST", url, request_params)
+        reason, success, result = self.requestEx(url, request_function, request_params, method="POST", retry=retry)
+        self.invalidate_cache(url)
+        return reason, success, result
+    def put(self, url, data={}, retry=None, **kwargs):
+        """
+        docs:
+            http://docs.python-requests.org/en/master/
+        summary:
+            Method used as requestEx method's parameter
+        params:
+            url - URL of the api endpoint
+            data - PUT data
+            retry - True/False force/disable retries (see MGApiRetryPolicy)
+        returns: (3 value/s)
+            reason - reason for exception
+            success - indicator of success (Bool)
+            result - result of request
+        """
+        request_function = self.ret_session().put
+        request_params = {
+            "data": data,
+            **kwargs
+        }
+        self.log_request("MGApiRequests.put", "PUT", url, request_params)
+        reason, success, result = self.requestEx(url, request_function, request_params, method="PUT", retry=retry)
+        self.invalidate_cache(url)
+        return reason, success, result
+    def delete(self, url, params={}, retry=None, **kwargs):
+        """
+        docs:
+            http://docs.python-requests.org/en/master/
+        summary:
+            Method used as requestEx method's parameter
+        params:
+            url - URL of the api endpoint
+            params - DELETE parameters
+            retry - True/False force/disable retries (see MGApiRetryPolicy)
+        returns: (3 value/s)
+            reason - reason for exception
+            success - indicator of success (Bool)
+            result - result of request
+        """
+        request_function = self.ret_session().delete
+        request_params = {
+            "params": params,
+            **kwargs
+        }
+        self.log_request("MGApiRequests.delete", "DELETE", url, request_params)
+        reason, success, result = self.requestEx(url, request_function, request_params, method="DELETE", retry=retry)
+        self.invalidate_cache(url)
+        return reason, success, result
+
+    def parseResponse(self, reason, success, result, caller="", raw=False):
+        """
+        summary:
+            Judges if request was success by success parameter
+            Parse time and request metrics are recorded under caller
+            if metrics are enabled (see MGApiMetrics)
+        params:
+            reason - reason for exception
+            success - indicator of success (Bool)
+            result - result of request
+            caller - caller method
+            raw - return undecoded body as serialized (see MGApiUtils.to_raw)
+        returns: (2 value/s)
+            deserialized and serialized json
+        """
+        if self.metrics is None:
+            return self.judgeResponse(reason, success, result, caller=caller, raw=raw)
+        start = time.perf_counter()
+        response = self.judgeResponse(reason, success, result, caller=caller, raw=raw)
+        self.metrics.record_response(caller, time.perf_counter() - start)
+        if response.serialize_function is not None:
+            response.serialize_function = self.metrics.timed_serialize(caller, response.serialize_function)
+        return response
+    def judgeResponse(self, reason, success, result, caller="", raw=False):
+        """
+            (see parseResponse)
+        """
+        # Success
+        if success:
+            if raw:
+                return self.to_raw(result.content)
+            # Calling self.to_json should only occur when request
+            # is considered to be success=True
+            return self.to_json(result.content)
+        # Error
+        deserialized = {}
+        deserialized = self.justify(
+            deserialized,
+            "Operation failed: {caller}".format(caller=caller),
+            success=success,
+            reason=reason
+        )
+        return MGApiResponse(deserialized, serialized=self.serialize_json(deserialized))
+# Api
+class Api(MGApiRequests):
+    def __init__(self, domain="", api_user="", private_key="", base_url="", config_file=None, debug=None,
+                 pool_connections=None, pool_maxsize=None, rate_limits=None, retry_policy=None, json_backend=None):
+        MGApiConfiguration.__init__(self)
+        self._DEBUG = debug if debug is not None else self._DEBUG
+        self._JSON_BACKEND = json_backend if json_backend is not None else self._JSON_BACKEND
+        self._POOL_CONNECTIONS = pool_connections if pool_connections is not None else self._POOL_CONNECTIONS
+        self._POOL_MAXSIZE     = pool_maxsize     if pool_maxsize     is not None else self._POOL_MAXSIZE
+        # Session is opened on first request (see MGApiRequests.ret_session)
+        self.session = None
+        self._session_lock = threading.Lock()
+        # Shared by all threads using this object
+        self.rate_limiter = MGApiRateLimiter(
+            {**self._RATE_LIMITS, **(rate_limits if rate_limits else {})},
+            burst=self._RATE_LIMIT_BURST
+        )
+        self.retry_policy = retry_policy if retry_policy is not None else MGApiRetryPolicy(
+            max_attempts=self._RETRY_MAX_ATTEMPTS,
+            backoff_base=self._RETRY_BACKOFF_BASE,
+            backoff_cap=self._RETRY_BACKOFF_CAP,
+            jitter=self._RETRY_JITTER,
+            retry_statuses=self._RETRY_STATUSES,
+            methods=self._RETRY_METHODS
+        )
+        # Response cache is opt-in (see Api.enable_cache)
+        self.cache = None
+        # Pre-send filter is opt-in (see MGApiSupressionIndex)
+        self.supression_index = None
+        # Instrumentation is opt-in (see Api.enable_metrics)
+        self.metrics = None
+
+        self.read_config(
+            domain=domain,
+            api_user=api_user,
+            private_key=private_key,
+            base_url=base_url,
+            config_file=config_file
+        )
+
+    # Response cache
+    def enable_cache(self, ttls=None, max_entries=None, path=None):
+        """
+        summary:
+            Turns on caching of GET responses of read-only endpoints
+            (get_domains, get_tags, get_lists, get_tag_aggregates,
+            get_tag_stats, get_stats_total by default)
+        params:
+            ttls - seconds by endpoint family (default _CACHE_TTLS)
+            max_entries - LRU size bound (default _CACHE_MAX_ENTRIES)
+            path - SQLite file shared by processes (default in memory)
+        returns: (1 value/s)
+            MGApiResponseCache object (see its stats)
+        """
+        self.cache = MGApiResponseCache(
+            ttls if ttls is not None else self._CACHE_TTLS,
+            max_entries=max_entries if max_entries is not None else self._CACHE_MAX_ENTRIES,
+            path=path
+        )
+        return self.cache
+    def disable_cache(self):
+        self.cache = None
+
+    # Instrumentation
+    def enable_metrics(self, metrics=None):
+        """
+        summary:
+            Turns on recording of request metrics and spans
+        params:
+            metrics - MGApiMetrics object (e.g. shared by several Api objects
+                      or with custom buckets/on_span), default new one
+        returns: (1 value/s)
+            MGApiMetrics object (see to_prometheus, ret_spans)
+        """
+        self.metrics = metrics if metrics is not None else MGApiMetrics()
+        return self.metrics
+    def disable_metrics(self):
+        self.metrics = None
+
+    # Pagination
+    def follow_pagination(self, Next="", deserialized_response="", raw=False):
+        """
+        summary:
+            Follows pagination until items array lenght is 0
+        params:
+            deserialized_response - deserialized json (api response)
+            raw - serialized is undecoded body (see MGApiUtils.to_raw)
+        returns: (3 value/s)
+            exhausted - indicates that there is no items left
+            deserialized - deserialized json
+            serialized - serialized json
+            (MGApiResponse, serialized is built when unpacked or accessed)
+        """
+        exhausted = False
+
+        if not Next and not deserialized_response:
+            deserialized = self.justify({},
+                "To follow pagination you need to provide at least one parameter",
+                success=False,
+                reason="'Next' and 'deserialized_response' is not set"
+                )
+            return MGApiResponse(deserialized, serialize_function=self.serialize_json, prefix=(exhausted,))
+
+        if deserialized_response and not Next:
+            # Check if paging key exists
+            deserialized = self.not_in_justify(
+                "paging",
+                deserialized_response.keys(),
+                caller="Api.follow_pagination",
+                reason="KeyError 'paging'",
+                success=False
+            )[0]
+            if deserialized:
+                return MGApiResponse(deserialized, serialize_function=self.serialize_json, prefix=(exhausted,))
+            # Check if next key exists
+            deserialized = self.not_in_justify(
+                "next",
+                deserialized_response["paging"].keys(),
+                caller="Api.follow_pagination",
+                reason="KeyError 'next' in paging",
+                success=False
+            )[0]
+            if deserialized:
+                return MGApiResponse(deserialized, serialize_function=self.serialize_json, prefix=(exhausted,))
+            url = deserialized_response["paging"]["next"]
+        else:
+            url = Next
+
+        reason, success, result = self.get(url, params={})
+        response = self.parseResponse(reason, success, result, caller="Api.follow_pagination", raw=raw)
+        deserialized = response.deserialized
+        if deserialized["justify"]["success"]:
+            if raw:
+                exhausted = deserialized.get("empty", True)
+            else:
+                exhausted = True if len(deserialized["items"]) == 0 else False
+        return MGApiResponse(deserialized, response._serialized, response.serialize_function, prefix=(exhausted,))
+    def iter_pages(self, deserialized_response, prefetch=False):
+        """
+        summary:
+            Yields pages starting from deserialized_response and following
+            pagination 'next' link until page with no items.
+            Only one page is held at a time (see prefetch).
+        params:
+            deserialized_response - deserialized json (first page)
+            prefetch - False, True (1) or read-ahead depth (int): next pages are
+                       fetched in background thread while caller processes
+                       current one, fetching pauses when 'prefetch' pages
+                       are waiting (backpressure)
+        yields:
+            deserialized json (page)
+        raises:
+            MGApiException - if any of requests failed
+            ValueError     - if deserialized_response has no 'items' (raw=True)
+        """
+        self.check_pages(deserialized_response)
+        if prefetch:
+            yield from self.iter_pages_prefetch(deserialized_response, depth=int(prefetch))
+            return
+        deserialized = deserialized_response
+        while True:
+            if not deserialized["justify"]["success"]:
+                raise MGApiException(deserialized)
+            if len(deserialized["items"]) == 0:
+                return
+            yield deserialized
+            exhausted, deserialized = self.follow_pagination(deserialized_response=deserialized)[:2]
+            if exhausted:
+                return
+    @staticmethod
+    def _put_pages(pages, item, stop):
+        """
+        summary:
+            Puts item to bounded queue of prefetching thread, blocks while
+            queue is full and gives up when consumer is gone (stop is set)
+        returns: (1 value/s)
+            True if item was put
+        """
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    def iter_pages_prefetch(self, deserialized_response, depth=1):
+        """
+        summary:
+            iter_pages with background thread following pagination,
+            pages are handed over in order through queue of size 'depth'
+        """
+        pages = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+
+        def put(item):
+            return self._put_pages(pages, item, stop)
+
+        def follow():
+            deserialized = deserialized_response
+            try:
+                while True:
+                    if not deserialized["justify"]["success"]:
+                        put(("error", deserialized))
+                        return
+                    if len(deserialized["items"]) == 0:
+                        put(("end", None))
+                        return
+                    if not put(("page", deserialized)):
+                        return
+                    exhausted, deserialized = self.follow_pagination(deserialized_response=deserialized)[:2]
+                    if exhausted:
+                        put(("end", None))
+                        return
+            except Exception as e:
+                put(("exception", e))
+
+        thread = threading.Thread(target=follow, name="mgapi-prefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                kind, value = pages.get()
+                if kind == "page":
+                    yield value
+                elif kind == "end":
+                    return
+                elif kind == "error":
+                    raise MGApiException(value)
+                else:
+                    raise value
+        finally:
+            stop.set()
+
+    # Domains
+    def get_domains(self, domain="", limit=100, skip=0):
+        """
+            GET /domains/<domain>
+            GET /domains
+        """
+        url, params = self.ret_domains_request(domain=domain, limit=limit, skip=skip)
+        reason, success, result = self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="Api.get_domains")
+
+    # Supressions (method used by get_bounces, get_unsubscribes and get_complaints)
+    def get_supressions(self, get_what, address="", domain="", limit=100, caller="<not_set>"):
+        """
+        summary:
+            DRY for get_bounces, get_complaints and get_unsubscribes
+        params:
+            get_what - {bounces, complaints, unsubscribes}
+            address - email address
+            domain - domain name
+            limit - limit of items returned
+            caller - caller method
+        returns: (2 value/s)
+            deserialized - deserialized json
+            serialized - serialized json
+        """
+        url, params = self.ret_supressions_request(get_what, address=address, domain=domain, limit=limit)
+        reason, success, result = self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller=caller)
+    # Bounces
+    def get_bounces(self, address="", domain="", limit=100):
+        """
+            GET /<domain>/bounces
+            GET /<domain>/bounces/<address>
+        """
+        return self.get_supressions(
+            "bounces",
+            address=address,
+            domain=domain,
+            limit=limit,
+            caller="Api.get_bounces"
+        )
+    # Unsubscribes
+    def get_unsubscribes(self, address="", domain="", limit=100):
+        """
+            GET /<domain>/unsubscribes
+            GET /<domain>/unsubscribes/<address>
+        """
+        return self.get_supressions(
+            "unsubscribes",
+            address=address,
+            domain=domain,
+            limit=limit,
+            caller="Api.get_unsubscribes"
+        )
+    # Complaints
+    def get_complaints(self, address="", domain="", limit=100):
+        """
+            GET /<domain>/complaints
+            GET /<domain>/complaints/<address>
+        """
+        return self.get_supressions(
+            "complaints",
+            address=address,
+            domain=domain,
+            limit=limit,
+            caller="Api.get_complaints"
+        )
+    # Supressions (pagination, import and sync)
+    def iter_supressions(self, get_what, domain="", limit=1000, chunked=False, prefetch=False):
+        """
+        summary:
+            Follows pagination of get_supressions and yields every
+            bounce/unsubscribe/complaint
+        params:
+            get_what - {bounces, complaints, unsubscribes}
+            domain - domain name
+            limit - items per page
+            chunked - yield whole pages (list of items) instead of single items
+            prefetch - read-ahead depth (see iter_pages)
+        yields:
+            item (or list of items if chunked=True)
+        raises:
+            MGApiException - if any of requests failed
+        """
+        deserialized = self.get_supressions(
+            get_what,
+            domain=domain,
+            limit=limit,
+            caller="Api.iter_supressions"
+        )[0]
+        for page in self.iter_pages(deserialized, prefetch=prefetch):
+            if chunked:
+                yield page["items"]
+            else:
+                yield from page["items"]
+    def iter_bounces(self, domain="", limit=1000, chunked=False, prefetch=False):
+        """
+            GET /<domain>/bounces ( follows pagination )
+        """
+        return self.iter_supressions("bounces", domain=domain, limit=limit, chunked=chunked, prefetch=prefetch)
+    def iter_unsubscribes(self, domain="", limit=1000, chunked=False, prefetch=False):
+        """
+            GET /<domain>/unsubscribes ( follows pagination )
+        """
+        return self.iter_supressions("unsubscribes", domain=domain, limit=limit, chunked=chunked, prefetch=prefetch)
+    def iter_complaints(self, domain="", limit=1000, chunked=False, prefetch=False):
+        """
+            GET /<domain>/complaints ( follows pagination )
+        """
+        return self.iter_supressions("complaints", domain=domain, limit=limit, chunked=chunked, prefetch=prefetch)
+    def add_supressions(self, get_what, items, domain=""):
+        """
+            POST /<domain>/bounces
+            POST /<domain>/unsubscribes
+            POST /<domain>/complaints
+            (max _MAX_SUPRESSIONS_PER_REQUEST items, see sync_supressions)
+        params:
+            get_what - {bounces, complaints, unsubscribes}
+            items - list of dictionaries with 'address' key
+                    (bounces: code, error; unsubscribes: tags)
+        """
+        cp_domain = domain if domain else self.domain
+        url = "{base_url}/{domain}/{get_what}".format(base_url=self.base_url, domain=cp_domain, get_what=get_what)
+        items_json_string = self.serialize_json(items, sort_keys=False, indent=None, separators=(",", ":"))
+        reason, success, result = self.post(
+            url,
+            data=items_json_string.encode("utf8"),
+            headers={"Content-Type": "application/json"},
+            retry=True
+        )
+        return self.parseResponse(reason, success, result, caller="Api.add_supressions")
+    def delete_supression(self, get_what, address, domain=""):
+        """
+            DELETE /<domain>/bounces/<address>
+            DELETE /<domain>/unsubscribes/<address>
+            DELETE /<domain>/complaints/<address>
+        """
+        cp_domain = domain if domain else self.domain
+        url = "{base_url}/{domain}/{get_what}/{address}".format(
+            base_url=self.base_url,
+            domain=cp_domain,
+            get_what=get_what,
+            address=address
+        )
+        reason, success, result = self.delete(url, retry=True)
+        return self.parseResponse(reason, success, result, caller="Api.delete_supression")
+    def export_supressions(self, get_what, path, domain="", compression="auto"):
+        """
+        summary:
+            Writes all bounces/unsubscribes/complaints to NDJSON file
+            (one item per line) page by page
+        params:
+            path - path of output file, binary file object or MGApiNDJSONWriter (left open)
+            compression - see MGApiNDJSONWriter
+        returns: (1 value/s)
+            number of exported items
+        raises:
+            MGApiException - if any of requests failed
+        """
+        return self.export_pages(
+            path,
+            self.iter_supressions(get_what, domain=domain, chunked=True, prefetch=True),
+            compression=compression
+        )
+    def export_pages(self, path, pages, compression="auto"):
+        """
+        summary:
+            Writes pages (lists of items) to NDJSON file as they arrive
+        params:
+            path - path of output file, binary file object or MGApiNDJSONWriter (left open)
+            pages - iterable of lists of items
+            compression - see MGApiNDJSONWriter
+        returns: (1 value/s)
+            number of written items
+        """
+        if isinstance(path, MGApiNDJSONWriter):
+            writer = path
+        else:
+            writer = MGApiNDJSONWriter(path, compression=compression, json_backend=self._JSON_BACKEND)
+        count = 0
+        try:
+            for page in pages:
+                count += writer.write_many(page)
+        finally:
+            if writer is not path:
+                writer.close()
+        return count
+    def sync_supressions(self, get_what, local, domain="", remove=False, concurrency=4, chunk_size=None):
+        """
+        summary:
+            Diffs local suppression set against Mailgun and pushes only
+            the changes: missing items are added in chunks of chunk_size
+            (max _MAX_SUPRESSIONS_PER_REQUEST), items missing locally are
+            deleted if remove=True. Requests run concurrently.
+            Addresses are compared case-insensitively.
+        params:
+            get_what - {bounces, complaints, unsubscribes}
+            local - iterable of addresses or dictionaries with 'address' key
+                    (see add_supressions)
+            remove - delete items which are not in local
+            concurrency - max number of requests at once
+            chunk_size - items per request
+        returns: (1 value/s)
+            summary dictionary {added, removed, failed} where failed is
+            list of {addresses, reason}
+        raises:
+            MGApiException - if fetching current items failed
+        """
+        if chunk_size is None or chunk_size < 1 or chunk_size > self._MAX_SUPRESSIONS_PER_REQUEST:
+            chunk_size = self._MAX_SUPRESSIONS_PER_REQUEST
+        # Lowercased only for comparison, requests use addresses as they are
+        remote = {item["address"].lower(): item["address"] for item in self.iter_supressions(get_what, domain=domain, prefetch=True)}
+        local_items = {}
+        for item in local:
+            item = {"address": item} if isinstance(item, str) else item
+            local_items[item["address"].lower()] = item
+        to_add = [item for address, item in local_items.items() if address not in remote]
+        to_remove = [remote[address] for address in remote if address not in local_items] if remove else []
+
+        summary = {"added": 0, "removed": 0, "failed": []}
+        chunks = [to_add[index:index + chunk_size] for index in range(0, len(to_add), chunk_size)]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            added = executor.map(lambda chunk: self.add_supressions(get_what, chunk, domain=domain)[0], chunks)
+            removed = executor.map(lambda address: self.delete_supression(get_what, address, domain=domain)[0], to_remove)
+            for chunk, deserialized in zip(chunks, added):
+                if deserialized["justify"]["success"]:
+                    summary["added"] += len(chunk)
+                else:
+                    summary["failed"].append({"addresses": [item["address"] for item in chunk], "reason": deserialized["justify"]["reason"]})
+            for address, deserialized in zip(to_remove, removed):
+                if deserialized["justify"]["success"]:
+                    summary["removed"] += 1
+                else:
+                    summary["failed"].append({"addresses": [address], "reason": deserialized["justify"]["reason"]})
+        return summary
+
+    # Mailing Lists
+    def get_lists(self, address="", limit=100):
+        """
+            GET /lists/<address>
+            GET /lists/pages
+        """
+        url, params = self.ret_lists_request(address=address, limit=limit)
+        reason, success, result = self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="Api.get_lists")
+    def add_list(self, address, name="", description="", access_level="readonly"):
+        """
+            POST /lists
+        """
+        url, data = self.ret_add_list_request(address, name=name, description=description, access_level=access_level)
+        reason, success, result = self.post(url, data=data)
+        return self.parseResponse(reason, success, result, caller="Api.add_list")
+    def get_members(self, address, member_address="", limit=100, subscribed=None):
+        """
+            GET /lists/<address>/members/<member_address>
+            GET /lists/<address>/members/pages
+        """
+        url, params = self.ret_members_request(address, member_address=member_address, limit=limit, subscribed=subscribed)
+        reason, success, result = self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="Api.get_members")
+    def iter_members(self, address, limit=100, subscribed=None, chunked=False, prefetch=False):
+        """
+        summary:
+            Same as get_members but follows pagination and yields members
+            one at a time, memory usage doesn't depend on list size
+        params:
+            address - mailing list address
+            limit - members per page
+            subscribed - {yes, no, None}
+            chunked - yield whole pages (list of members) instead of single members
+            prefetch - read-ahead depth (see iter_pages)
+        yields:
+            member (or list of members if chunked=True)
+        raises:
+            MGApiException - if any of requests failed
+        """
+        deserialized = self.get_members(address, limit=limit, subscribed=subscribed)[0]
+        for page in self.iter_pages(deserialized, prefetch=prefetch):
+            if chunked:
+                yield page["items"]
+            else:
+                yield from page["items"]
+    def export_members(self, address, path, file_format="csv", subscribed=None, prefetch=True, compression="auto"):
+        """
+        summary:
+            Writes all members of mailing list to file page by page
+            (constant memory usage)
+        params:
+            address - mailing list address
+            path - path of output file
+            file_format - {csv, ndjson}
+                csv    - address, name, subscribed, vars (json) columns
+                ndjson - one member (json) per line (see export_pages)
+            subscribed - {yes, no, None}
+            prefetch - fetch next page while current one is written
+            compression - see MGApiNDJSONWriter (applies to both formats)
+        returns: (1 value/s)
+            number of exported members
+        raises:
+            MGApiException - if any of requests failed
+        """
+        pages = self.iter_members(address, limit=100, subscribed=subscribed, chunked=True, prefetch=prefetch)
+        if file_format == "ndjson":
+            return self.export_pages(path, pages, compression=compression)
+        count = 0
+        target, finish = MGApiNDJSONWriter.open_file(path, compression=compression)
+        text = io.TextIOWrapper(target, encoding="utf8", newline="", write_through=True)
+        try:
+            writer = csv.writer(text)
+            writer.writerow(["address", "name", "subscribed", "vars"])
+            for page in pages:
+                writer.writerows([
+                    member.get("address"), member.get("name"), member.get("subscribed"),
+                    json.dumps(member.get("vars") or {}, separators=(",", ":"))
+                ] for member in page)
+                count += len(page)
+        finally:
+            # Wrapper would close target (caller's stream) when collected
+            text.detach()
+            finish()
+        return count
+    def bulk_add_members(self, address, members, upsert="no", retry=None):
+        """
+            POST /lists/<address>/members.json
+            (max _MAX_MEMBERS_PER_REQUEST members, see bulk_import_members)
+        """
+        url, data = self.ret_bulk_add_members_request(address, members, upsert=upsert)
+        reason, success, result = self.post(url, data=data, retry=retry)
+        return self.parseResponse(reason, success, result, caller="Api.bulk_add_members")
+    def read_members_csv(self, path, encoding="utf8"):
+        """
+        summary:
+            Yields members from CSV file with header row
+            (address, name, vars, subscribed columns), 'vars' is json string
+        params:
+            path - path of CSV file
+        yields:
+            member dictionary
+        """
+        with open(path, "r", encoding=encoding, newline="") as source:
+            for row in csv.DictReader(source):
+                member = {key: value for key, value in row.items() if key and value not in (None, "")}
+                if "vars" in member:
+                    member["vars"] = self.deserialize_json(member["vars"])
+                yield member
+    def bulk_import_members(self, address, members, upsert="no", chunk_size=None, concurrency=4, progress=None):
+        """
+        summary:
+            Imports any number of members: members are read lazily, split
+            into chunks of chunk_size (max _MAX_MEMBERS_PER_REQUEST) and
+            uploaded concurrently with bulk_add_members (failed chunks are
+            retried, see MGApiRetryPolicy)
+        params:
+            address - mailing list address
+            members - iterable of member dictionaries or path of CSV file (see read_members_csv)
+            upsert - {yes, no}
+            chunk_size - members per request
+            concurrency - max number of requests at once
+            progress - function called after every chunk with summary dictionary
+        returns: (1 value/s)
+            summary dictionary:
+                chunks        - number of uploaded chunks
+                members       - number of uploaded members
+                failed_chunks - list of {index, members, reason} of failed chunks
+                elapsed       - seconds
+        """
+        if chunk_size is None or chunk_size < 1 or chunk_size > self._MAX_MEMBERS_PER_REQUEST:
+            chunk_size = self._MAX_MEMBERS_PER_REQUEST
+        if isinstance(members, str):
+            members = self.read_members_csv(members)
+        members_iter = iter(members)
+        summary = {"chunks": 0, "members": 0, "failed_chunks": [], "elapsed": 0.0}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = {}
+            index, exhausted = 0, False
+            while pending or not exhausted:
+                # Keep at most 2 * concurrency chunks in memory
+                while not exhausted and len(pending) < 2 * concurrency:
+                    chunk = list(itertools.islice(members_iter, chunk_size))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    future = executor.submit(self.bulk_add_members, address, chunk, upsert=upsert, retry=True)
+                    pending[future] = (index, chunk)
+                    index += 1
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk_index, chunk = pending.pop(future)
+                    deserialized = future.result()[0]
+                    if deserialized["justify"]["success"]:
+                        summary["chunks"] += 1
+                        summary["members"] += len(chunk)
+                    else:
+                        summary["failed_chunks"].append({
+                            "index": chunk_index,
+                            "members": chunk,
+                            "reason": deserialized["justify"]["reason"]
+                        })
+                    summary["elapsed"] = time.perf_counter() - start
+                    if progress is not None:
+                        progress(summary)
+        summary["elapsed"] = time.perf_counter() - start
+        return summary
+
+    # Events
+    def ret_events_filter_fields(self):
+        """
+
+        """
+        ret = {
+            "event": None,
+            "list": None,
+            "attachment": None,
+            "from": None,
+            "message-id": None,
+            "subject": None,
+            "to": None,
+            "size": None,
+            "recipient": None,
+            "tags": None,
+            "severity": None
+        }
+        return ret
+    def get_events(self, domain="", begin="", end="", ascending="yes", limit=300, filter_fields={}, raw=False):
+        """
+            GET /<domain>/events
+            raw=True - serialized is memoryview of response body (see MGApiUtils.to_raw)
+        """
+        url, params = self.ret_events_request(
+            domain=domain,
+            begin=begin,
+            end=end,
+            ascending=ascending,
+            limit=limit,
+            filter_fields=filter_fields
+        )
+        reason, success, result = self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="Api.get_events", raw=raw)
+    def iter_events(self, domain="", begin="", end="", ascending="yes", limit=300, filter_fields={}, chunked=False,
+                    prefetch=False):
+        """
+        summary:
+            Same as get_events but follows pagination and yields events
+            one at a time, memory usage doesn't depend on time window
+        params:
+            (see get_events)
+            chunked - yield whole pages (list of events) instead of single events
+            prefetch - read-ahead depth (see iter_pages)
+        yields:
+            event (or list of events if chunked=True)
+        raises:
+            MGApiException - if any of requests failed
+        """
+        deserialized = self.get_events(
+            domain=domain,
+            begin=begin,
+            end=end,
+            ascending=ascending,
+            limit=limit,
+            filter_fields=filter_fields
+        )[0]
+        for page in self.iter_pages(deserialized, prefetch=prefetch):
+            if chunked:
+                yield page["items"]
+            else:
+                yield from page["items"]
+
+    def iter_events_parallel(self, begin, end, slices=4, domain="", ascending="yes", limit=300, filter_fields={},
+                             depth=2):
+        """
+        summary:
+            Splits begin-end window into 'slices' sub-ranges, follows pagination
+            of every sub-range in its own thread and yields events merged
+            in timestamp order as pages arrive. Events returned by two
+            neighbouring sub-ranges (same timestamp and id) are yielded once.
+            Every thread waits when 'depth' of its pages are not yielded yet,
+            so at most slices * (depth + 1) pages are held in memory.
+        params:
+            begin, end - unix timestamp, datetime.datetime or RFC2822 string
+            slices - number of sub-ranges (and threads), >= 1
+            depth - read-ahead pages per sub-range, >= 1
+            (rest see get_events)
+        yields:
+            event
+        raises:
+            ValueError - if slices or depth is less than 1
+            MGApiException - if any of requests failed
+        """
+        if slices < 1:
+            raise ValueError("slices must be >= 1, got {slices}".format(slices=slices))
+        if depth < 1:
+            raise ValueError("depth must be >= 1, got {depth}".format(depth=depth))
+        begin, end = self.ret_timestamp(begin), self.ret_timestamp(end)
+        step = (end - begin) / slices
+        ranges = [(begin + step * index, end if index == slices - 1 else begin + step * (index + 1)) for index in range(slices)]
+        if ascending != "yes":
+            ranges.reverse()
+        stop = threading.Event()
+
+        def put(pages, item):
+            return self._put_pages(pages, item, stop)
+
+        def fetch(time_range, pages):
+            try:
+                for page in self.iter_events(
+                    domain=domain,
+                    begin=time_range[0],
+                    end=time_range[1],
+                    ascending=ascending,
+                    limit=limit,
+                    filter_fields=filter_fields,
+                    chunked=True
+                ):
+                    if not put(pages, ("page", page)):
+                        return
+                put(pages, ("end", None))
+            except Exception as e:
+                put(pages, ("exception", e))
+
+        def events(pages):
+            while True:
+                kind, value = pages.get()
+                if kind == "end":
+                    return
+                if kind == "exception":
+                    raise value
+                yield from value
+
+        queues = [queue.Queue(maxsize=depth) for _ in ranges]
+        with ThreadPoolExecutor(max_workers=slices) as executor:
+            try:
+                for time_range, pages in zip(ranges, queues):
+                    executor.submit(fetch, time_range, pages)
+                merged = heapq.merge(
+                    *[events(pages) for pages in queues],
+                    key=lambda event: event["timestamp"],
+                    reverse=ascending != "yes"
+                )
+                last_timestamp, seen_ids = None, set()
+                for event in merged:
+                    if event["timestamp"] != last_timestamp:
+                        last_timestamp, seen_ids = event["timestamp"], set()
+                    if event["id"] in seen_ids:
+                        continue
+                    seen_ids.add(event["id"])
+                    yield event
+            finally:
+                stop.set()
+
+    def export_events(self, path, domain="", begin="", end="", ascending="yes", limit=300, filter_fields={},
+                      compression="auto", prefetch=2):
+        """
+        summary:
+            Writes events to NDJSON file (one event per line) as pages
+            arrive, memory usage doesn't depend on time window
+        params:
+            path - path of output file, binary file object or MGApiNDJSONWriter (left open)
+            compression - {auto, gzip, zstd, None} (see MGApiNDJSONWriter)
+            prefetch - read-ahead depth (see iter_pages)
+            (rest see get_events)
+        returns: (1 value/s)
+            number of exported events
+        raises:
+            MGApiException - if any of requests failed
+        """
+        pages = self.iter_events(domain=domain, begin=begin, end=end, ascending=ascending, limit=limit,
+                                 filter_fields=filter_fields, chunked=True, prefetch=prefetch)
+        return self.export_pages(path, pages, compression=compression)
+    def store_events(self, store, domain="", begin="", end="", limit=300, filter_fields={}):
+        """
+        summary:
+            Streams events (page by page) into local store
+        params:
+            store - MGApiEventStore object
+            (rest see get_events)
+        returns: (1 value/s)
+            number of events inserted (events already in store are skipped)
+        raises:
+            MGApiException - if any of requests failed
+        """
+        inserted = 0
+        for page in self.iter_events(domain=domain, begin=begin, end=end, limit=limit,
+                                     filter_fields=filter_fields, chunked=True):
+            inserted += store.add_events(page)
+        return inserted
+
+    # Event polling
+    def read_checkpoint(self, checkpoint_file):
+        """
+        summary:
+            Reads event polling checkpoint (see poll_events)
+        params:
+            checkpoint_file - path of json checkpoint file
+        returns: (1 value/s)
+            checkpoint dictionary (empty if file doesn't exist)
+        """
+        try:
+            with open(checkpoint_file, "rb") as source:
+                return self.deserialize_json(source.read())
+        except FileNotFoundError:
+            return {}
+    def write_checkpoint(self, checkpoint_file, checkpoint):
+        """
+        summary:
+            Writes event polling checkpoint atomically
+            (file is never left half-written)
+        params:
+            checkpoint_file - path of json checkpoint file
+            checkpoint - checkpoint dictionary
+        """
+        tmp_file = "{path}.tmp".format(path=checkpoint_file)
+        with open(tmp_file, "wb") as target:
+            target.write(self.serialize_json(checkpoint).encode("utf8"))
+        os.replace(tmp_file, checkpoint_file)
+    def poll_events_pages(self, deserialized_response, checkpoint, checkpoint_file):
+        """
+        summary:
+            Yields events newer than checkpoint from deserialized_response and
+            following pages, writes checkpoint after every page
+        """
+        for page in self.iter_pages(deserialized_response):
+            for event in page["items"]:
+                timestamp = event["timestamp"]
+                if checkpoint["timestamp"] is not None:
+                    if timestamp < checkpoint["timestamp"]:
+                        continue
+                    if timestamp == checkpoint["timestamp"] and event["id"] in checkpoint["ids"]:
+                        continue
+                yield event
+                if timestamp != checkpoint["timestamp"]:
+                    checkpoint["timestamp"], checkpoint["ids"] = timestamp, []
+                checkpoint["ids"].append(event["id"])
+            checkpoint["next"] = page["paging"]["next"]
+            self.write_checkpoint(checkpoint_file, checkpoint)
+    def poll_events(self, checkpoint_file, begin=None, domain="", limit=300, filter_fields={}, threshold=None):
         """
         docs:
-            https://documentation.mailgun.com/en/latest/api-sending.html#sending
+            https://documentation.mailgun.com/en/latest/api-events.html#event-polling
         summary:
-            adds new element to options dictionary
+            Yields only events that weren't yielded by previous runs.
+            Fetches events from checkpoint up to now - threshold (older events
+            are settled, see _EVENTS_POLL_THRESHOLD_SECONDS) and persists
+            checkpoint (last timestamp, ids of events with that timestamp,
+            'next' link of last page) after every page.
+            Interrupted run is resumed from saved 'next' link.
+            Events of page interrupted in the middle are yielded again
+            (at-least-once delivery).
         params:
-            options - dictionary
-            header - key
-            value - value
+            checkpoint_file - path of json checkpoint file
+            begin - start of first run (unix timestamp, datetime or RFC2822),
+                    if not set first run starts now - threshold
+            threshold - settle threshold in seconds
+            (rest see get_events)
+        yields:
+            event
+        raises:
+            MGApiException - if any of requests failed
+        """
+        threshold = self._EVENTS_POLL_THRESHOLD_SECONDS if threshold is None else threshold
+        checkpoint = {"timestamp": None, "ids": [], "next": None, "end": None}
+        checkpoint.update(self.read_checkpoint(checkpoint_file))
+
+        # Finish window of interrupted run
+        if checkpoint["next"]:
+            exhausted, deserialized = self.follow_pagination(Next=checkpoint["next"])[:2]
+            finished = deserialized["justify"]["success"]
+            if finished and not exhausted:
+                yield from self.poll_events_pages(deserialized, checkpoint, checkpoint_file)
+            if finished and (checkpoint["timestamp"] is None or checkpoint["timestamp"] < checkpoint["end"]):
+                checkpoint["timestamp"], checkpoint["ids"] = checkpoint["end"], []
+            checkpoint["next"] = None
+            self.write_checkpoint(checkpoint_file, checkpoint)
+
+        end = time.time() - threshold
+        if checkpoint["timestamp"] is not None:
+            begin = checkpoint["timestamp"]
+        else:
+            begin = self.ret_timestamp(begin) if begin is not None else end
+        if begin >= end:
+            return
+        checkpoint["end"] = end
+        deserialized = self.get_events(
+            domain=domain,
+            begin=begin,
+            end=end,
+            ascending="yes",
+            limit=limit,
+            filter_fields=filter_fields
+        )[0]
+        yield from self.poll_events_pages(deserialized, checkpoint, checkpoint_file)
+        # Whole window is settled, next run starts from its end
+        if checkpoint["timestamp"] is None or checkpoint["timestamp"] < end:
+            checkpoint["timestamp"], checkpoint["ids"] = end, []
+        checkpoint["next"] = None
+        self.write_checkpoint(checkpoint_file, checkpoint)
+
+    # Total stats
+    def get_stats_total(self, event, domain="", start="", end="", resolution="day", duration=""):
+        """
+            GET /<domain>/stats/total
+        """
+        response = self.ret_validation_error("Api.get_stats_total", event=event, resolution=resolution)
+        if response[0]:
+            return response
+        url, params = self.ret_stats_total_request(event, domain=domain, start=start, end=end, resolution=resolution, duration=duration)
+        reason, success, result = self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="Api.get_stats_total")
+
+    def get_stats_table(self, events, tags=None, domains=None, resolutions="day", start="", end="", duration="",
+                        concurrency=8, as_numpy=False):
+        """
+        summary:
+            Fetches stats of many events for many tags (get_tag_stats) or
+            many domains (get_stats_total) concurrently and merges them
+            into one time-aligned table per resolution.
+            Duplicated tags/domains/events/resolutions are fetched once.
+            e.g pandas:
+                table = des["tables"]["day"]
+                pandas.DataFrame(table["columns"], index=pandas.to_datetime(table["time"], unit="s"))
+        params:
+            events - list of event names (see _EVENTS)
+            tags - list of tags (None - domain stats)
+            domains - list of domains (None - domain from constructor)
+            resolutions - resolution or list of resolutions (see _RESOLUTIONS)
+            start, end, duration - (see get_stats_total)
+            concurrency - max number of requests at once
+            as_numpy - columns as numpy arrays (requires numpy)
+        returns: (2 value/s)
+            deserialized - {"tables": {resolution: table}} where table is
+                           {"time": [unix timestamps], "columns": {"<domain>[/<tag>]:<event>.<counter>": [values]}}
+            serialized - serialized json (not available if as_numpy=True)
+        """
+        if as_numpy and np is None:
+            raise ImportError("as_numpy=True requires numpy (pip install numpy)")
+        resolutions = [resolutions] if isinstance(resolutions, str) else resolutions
+        # dict.fromkeys - de-duplication preserving order
+        domains = list(dict.fromkeys(domains if domains else [self.domain]))
+        scopes = [(domain, tag) for domain in domains for tag in dict.fromkeys(tags)] if tags else [(domain, None) for domain in domains]
+        tasks = [
+            (domain, tag, event, resolution)
+            for resolution in dict.fromkeys(resolutions)
+            for domain, tag in scopes
+            for event in dict.fromkeys(events)
+        ]
+
+        def fetch(task):
+            domain, tag, event, resolution = task
+            if tag is None:
+                return self.get_stats_total(event, domain=domain, start=start, end=end, resolution=resolution, duration=duration)[0]
+            return self.get_tag_stats(tag, event, domain=domain, start=start, end=end, resolution=resolution, duration=duration)[0]
+
+        failed, rows = [], {resolution: {} for resolution in resolutions}
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for task, deserialized in zip(tasks, executor.map(fetch, tasks)):
+                domain, tag, event, resolution = task
+                scope = domain if tag is None else "{domain}/{tag}".format(domain=domain, tag=tag)
+                if not deserialized["justify"]["success"]:
+                    failed.append("{scope}:{event}:{resolution}".format(scope=scope, event=event, resolution=resolution))
+                    continue
+                for item in deserialized["stats"]:
+                    timestamp = utils.parsedate_to_datetime(item["time"]).timestamp()
+                    row = rows[resolution].setdefault(timestamp, {})
+                    for counter, value in self.flatten_stats(item).items():
+                        row["{scope}:{counter}".format(scope=scope, counter=counter)] = value
+
+        tables = {}
+        for resolution, resolution_rows in rows.items():
+            times = sorted(resolution_rows)
+            names = sorted(set(name for row in resolution_rows.values() for name in row))
+            columns = {name: [resolution_rows[timestamp].get(name, 0) for timestamp in times] for name in names}
+            if as_numpy:
+                times = np.array(times, dtype=np.float64)
+                columns = {name: np.array(values, dtype=np.float64) for name, values in columns.items()}
+            tables[resolution] = {"time": times, "columns": columns}
+
+        deserialized = {"tables": tables}
+        if failed:
+            deserialized = self.justify(deserialized, "Operation failed: Api.get_stats_table", success=False,
+                                        reason="Failed: {failed}".format(failed=", ".join(failed)))
+        else:
+            deserialized = self.justify(deserialized, "Operation succeeded.")
+        return MGApiResponse(deserialized, serialize_function=None if as_numpy else self.serialize_json)
+
+    # Tags
+    def get_tags(self, domain="", tag="", limit=100):
+        """
+            GET /<domain>/tags
+            GET /<domain>/tags/<tag>
+        """
+        url, params = self.ret_tags_request(domain=domain, tag=tag, limit=limit)
+        reason, success, result = self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="Api.get_tags")
+    def get_tag_stats(self, tag, event, domain="", start="", end="", resolution="day", duration=""):
+        """
+            GET /<domain>/tags/<tag>/stats
+        """
+        response = self.ret_validation_error("Api.get_tag_stats", event=event, resolution=resolution)
+        if response[0]:
+            return response
+        url, params = self.ret_tag_stats_request(tag, event, domain=domain, start=start, end=end, resolution=resolution, duration=duration)
+        reason, success, result = self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="Api.get_tag_stats")
+    def get_tag_aggregates(self, tag, aggregate, domain=""):
+        """
+            GET /<domain>/tags/<tag>/stats/aggregates/countries
+            GET /<domain>/tags/<tag>/stats/aggregates/providers
+            GET /<domain>/tags/<tag>/stats/aggregates/devices
+        """
+        response = self.ret_validation_error("Api.get_tag_aggregates", aggregate=aggregate)
+        if response[0]:
+            return response
+        url, params = self.ret_tag_aggregates_request(tag, aggregate, domain=domain)
+        reason, success, result = self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="Api.get_tag_aggregates")
+
+    # Reports
+    def get_report_data(self, tag, days=30, domain="", concurrency=8, events=True):
+        """
+        summary:
+            Fetches analytics data of single tag: tag info, aggregates,
+            stats and events for every event type from last 'days' days.
+            All requests run concurrently, events of all types are fetched
+            in one stream and grouped by event type locally.
+        params:
+            tag - tag name
+            days - number of days
+            domain - domain name
+            concurrency - max number of requests at once
+            events - fetch tag_events (False - stream them with export_events instead)
+        returns: (2 value/s)
+            deserialized - dictionary {tag_info, aggregates, tag_stats, tag_events, timings}
+                           tag_events - {event type: events} for every type of _EVENTS
+                                        (events of other types are skipped)
+                           timings - seconds spent per section (and total)
+            serialized - serialized json
+        """
+        begin = self.nowRFC2822(days=-days)
+        # we can set end parameter a little bit in the future just in case
+        end = self.nowRFC2822(minutes=30)
+
+        def fetch_events():
+            filter_fields = self.ret_events_filter_fields()
+            filter_fields["tags"] = [tag]
+            tag_events = {event: [] for event in self._EVENTS}
+            try:
+                for event in self.iter_events(domain=domain, begin=begin, end=end, limit=300,
+                                              filter_fields=filter_fields, prefetch=True):
+                    if event["event"] in tag_events:
+                        tag_events[event["event"]].append(event)
+            except MGApiException as e:
+                return e.deserialized
+            return tag_events
+
+        tasks = [("tag_info", None, lambda: self.get_tags(domain=domain, tag=tag)[0])]
+        for aggregate in self._AGGREGATES:
+            tasks.append(("aggregates", aggregate, lambda aggregate=aggregate: self.get_tag_aggregates(tag, aggregate, domain=domain)[0]))
+        for event in self._EVENTS:
+            tasks.append(("tag_stats", event, lambda event=event: self.get_tag_stats(tag, event, domain=domain, start=begin)[0]))
+        if events:
+            tasks.append(("tag_events", None, fetch_events))
+
+        def run(task):
+            section, key, function = task
+            start = time.perf_counter()
+            result = function()
+            return section, key, result, start, time.perf_counter()
+
+        ret = {"tag_info": {}, "aggregates": {}, "tag_stats": {}, "tag_events": {}, "timings": {}}
+        spans, failed = {}, []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for section, key, result, task_start, task_end in executor.map(run, tasks):
+                if key is None:
+                    ret[section] = result
+                else:
+                    ret[section][key] = result
+                if isinstance(result, dict) and "justify" in result and not result["justify"]["success"]:
+                    failed.append(section if key is None else "{section}.{key}".format(section=section, key=key))
+                first_start, last_end = spans.get(section, (task_start, task_end))
+                spans[section] = (min(first_start, task_start), max(last_end, task_end))
+        for section, (first_start, last_end) in spans.items():
+            ret["timings"][section] = last_end - first_start
+        ret["timings"]["total"] = time.perf_counter() - start
+
+        if failed:
+            ret = self.justify(ret, "Operation failed: Api.get_report_data", success=False,
+                               reason="Failed: {failed}".format(failed=", ".join(failed)))
+        else:
+            ret = self.justify(ret, "Operation succeeded.")
+        return MGApiResponse(ret, serialize_function=self.serialize_json)
+
+    # Sending
+    def ret_additional_sending_options(self, tracking=True, testmode=False):
+        """
+            return additional sending option
+        """
+        additional_options = {
+            "cc": None,
+            "bcc": None,
+            "attachment": None,
+            "inline": None,
+            "o:tag": [],
+            "o:dkim": None,
+            "o:deliverytime": None,
+            "o:testmode": None,
+            "o:tracking": None,
+            "o:tracking-clicks": None,
+            "o:tracking-opens": None,
+            "o:require-tls": None,
+            "o:skip-verification": None
+        }
+        if testmode:
+            additional_options["o:testmode"] = "yes"
+        if tracking:
+            additional_options["o:tracking"]        = "yes"
+            additional_options["o:tracking-clicks"] = "yes"
+            additional_options["o:tracking-opens"]  = "yes"
+
+        return additional_options
+    def send_single_message(self, From, to, subject, html, text, domain="", additional_sending_options=None):
+        """
+            POST /<domain>/messages
+        """
+        # Set default additional_sending_options if not set by user
+        if additional_sending_options is None:
+            additional_sending_options = self.ret_additional_sending_options()
+        # Skip suppressed recipients (to, cc and bcc)
+        if self.supression_index is not None:
+            tags = additional_sending_options.get("o:tag")
+            to = self.filter_supressed(to, tags=tags)
+            if not to:
+                deserialized = self.justify({}, "Operation failed: Api.send_single_message", success=False,
+                                            reason="All recipients are suppressed")
+                return MGApiResponse(deserialized, serialize_function=self.serialize_json)
+            additional_sending_options = dict(additional_sending_options)
+            for field in ("cc", "bcc"):
+                if additional_sending_options.get(field):
+                    additional_sending_options[field] = self.filter_supressed(additional_sending_options[field], tags=tags) or None
+        url, data = self.ret_message_request(From, to, subject, html, text, domain=domain,
+                                             additional_sending_options=additional_sending_options)
+        # debug (html and text are redacted, see _LOG_REDACT)
+        if self.log_sampled():
+            self.logger.debug("Api.send_single_message POST data %s", self.ret_log_payload(data, pretty=True))
+        # Actual sending
+        reason, success, result = self.post(url, data=data)
+        return self.parseResponse(reason, success, result, caller="Api.send_single_message")
+    def filter_supressed(self, to, tags=None):
+        """
+        summary:
+            Removes recipients found in supression_index
+        params:
+            to - recipients ("a@example.io, B <b@example.io>" or list)
+            tags - tags of message (see o:tag)
         returns: (1 value/s)
-            dictionary (options param) with added new element
+            list of recipients which are not suppressed
         """
-        options["h:{header}".format(header=header)] = value
-        return options
-    def options_add_variable(self, options, variable, value):
+        tags = [tags] if isinstance(tags, str) else tags
+        recipients = utils.getaddresses([to] if isinstance(to, str) else to)
+        return [
+            utils.formataddr((name, address)) for name, address in recipients
+            if address and not self.supression_index.is_suppressed(address, tags=tags)
+        ]
+    def send_batch_message(self, From, recipients, subject, html, text, domain="", additional_sending_options=None,
+                           batch_size=None):
         """
         docs:
-            https://documentation.mailgun.com/en/latest/api-sending.html#sending
+            https://documentation.mailgun.com/en/latest/user_manual.html#batch-sending
         summary:
-            adds new element to options dictionary
+            Sends personalized message to many recipients with
+            send_single_message, one POST per batch_size recipients with
+            'recipient-variables' (use %recipient.<variable>% in subject/html/text).
+            v: variables (see options_add_variable) are sent with every batch.
         params:
-            options - dictionary
-            header - key
-            value - value
+            recipients - dictionary {address: {variable: value}}
+                            or
+                         iterable of addresses or (address, {variable: value}) tuples
+            batch_size - recipients per POST (max _MAX_RECIPIENTS_PER_MESSAGE)
+            (rest see send_single_message)
         returns: (1 value/s)
-            dictionary (variable param) with added new element
+            list of (deserialized, serialized) responses, one per batch
         """
-        options["v:{variable}".format(variable=variable)] = value
-        return options
-    # Time
-    def nowRFC2822(self, days=0, hours=0, minutes=0, return_timestamp=False):
+        if batch_size is None or batch_size < 1 or batch_size > self._MAX_RECIPIENTS_PER_MESSAGE:
+            batch_size = self._MAX_RECIPIENTS_PER_MESSAGE
+        if additional_sending_options is None:
+            additional_sending_options = self.ret_additional_sending_options()
+        if isinstance(recipients, dict):
+            recipients = recipients.items()
+        recipients_iter = iter(recipients)
+        responses = []
+        while True:
+            batch = list(itertools.islice(recipients_iter, batch_size))
+            if not batch:
+                break
+            recipient_variables = {}
+            for recipient in batch:
+                address, variables = (recipient, {}) if isinstance(recipient, str) else recipient
+                # Without recipient-variables every recipient would see whole 'to' list
+                recipient_variables[address] = variables if variables else {}
+            sending_options = dict(additional_sending_options)
+            sending_options["recipient-variables"] = self.serialize_json(
+                recipient_variables, sort_keys=False, indent=None, separators=(",", ":")
+            )
+            responses.append(self.send_single_message(
+                From, list(recipient_variables.keys()), subject, html, text,
+                domain=domain,
+                additional_sending_options=sending_options
+            ))
+        return responses
+    def send_batch(self, messages, concurrency=8):
         """
-        docs:
-            https://documentation.mailgun.com/en/latest/api-sending.html#sending
         summary:
-            adds new element to options dictionary
+            Sends messages concurrently with send_single_message,
+            at most 'concurrency' messages are in flight at once.
+            Keep pool_maxsize (see Api constructor) >= concurrency,
+            otherwise connections above pool size are not reused.
         params:
-            days - [integer] number of days
-            hours - [integer] number of days
-            minutes - [integer] number of days
-            return_timestamp - Bool
-        returns: (1 value/s or 2 value/s)
-            RFC2822 datetime
-                or
-            RFC2822 datetime and it's timestamp
+            messages - iterable of dictionaries with send_single_message
+                       parameters (From, to, subject, html, text, domain,
+                       additional_sending_options)
+            concurrency - number of worker threads
+        yields:
+            dictionary for every message (in order of completion):
+                index        - position of message in messages
+                deserialized - deserialized json (api response)
+                serialized   - serialized json (api response)
+                sent         - number of messages sent so far
+                failed       - number of messages failed so far
+                elapsed      - seconds since first message
+                rate         - messages (sent and failed) per second
         """
-        timedelta_shift = datetime.timedelta(days=days, hours=hours, minutes=minutes)
-        now_datetime = datetime.datetime.now() + timedelta_shift
-        now_timestamp = time.mktime(now_datetime.timetuple())
-        # localtime=True (Sets local timezone)
-        result = utils.formatdate(now_timestamp, localtime=True)
-        self.print_debug("timedelta_shift:", timedelta_shift)
-        self.print_debug("now_datetime:", now_datetime)
-        self.print_debug("now_timestamp:", now_timestamp)
-        self.print_debug("result:", result)
-        if return_timestamp:
-            return result, now_timestamp
-        return result
-    def toRFC2822(_datetime, days=0, hours=0, minutes=0, return_timestamp=False):
-        timedelta_shift = datetime.timedelta(days=days, hours=hours, minutes=minutes)
-        now_datetime = _datetime + timedelta_shift
-        now_timestamp = time.mktime(now_datetime.timetuple())
-        # localtime=True (Sets local timezone)
-        result = utils.formatdate(now_timestamp, localtime=True)
-        # self.print_debug("timedelta_shift:", timedelta_shift)
-        # self.print_debug("now_datetime:", now_datetime)
-        # self.print_debug("now_timestamp:", now_timestamp)
-        # self.print_debug("result:", result)
-        if return_timestamp:
-            return result, now_timestamp
-        return result
-    def ISO8601(iso8601_string):
-        # Date
-        try:
-            date_part = iso8601_string.split("T")[0]
-            year, month, day = date_part.split("-")
-            year, month, day = int(year), int(month), int(day)
-        except Exception as e:
-            print("Exception:", e)
-            return False
-        # Time
-        try:
-            time_part = iso8601_string.split("T")[1].strip("Z")
-            time_part = time_part.split(".")[0] if "." in time_part else time_part
-            hour, minute, second = time_part.split(":")
-            hour, minute, second = int(hour), int(minute), int(second)
-        except Exception as e:
-            print("Exception:", e)
-            hour, minute, second = 0, 0, 0
-        result = datetime.datetime(
-            year=year     , month=month   , day=day,
-            hour=hour     , minute=minute , second=second,
-            microsecond=0 , tzinfo=None
+        sent, failed = 0, 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = {}
+            messages_iter = enumerate(messages)
+            exhausted = False
+            while pending or not exhausted:
+                # Keep at most 2 * concurrency messages queued
+                while not exhausted and len(pending) < 2 * concurrency:
+                    try:
+                        index, message = next(messages_iter)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[executor.submit(self.send_single_message, **message)] = index
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    deserialized, serialized = future.result()
+                    if deserialized["justify"]["success"]:
+                        sent += 1
+                    else:
+                        failed += 1
+                    elapsed = time.perf_counter() - start
+                    yield {
+                        "index": index,
+                        "deserialized": deserialized,
+                        "serialized": serialized,
+                        "sent": sent,
+                        "failed": failed,
+                        "elapsed": elapsed,
+                        "rate": (sent + failed) / elapsed if elapsed else 0.0
+                    }
+# Unification of request responses (asyncio)
+class MGApiAsyncRequests(MGApiUtils):
+
+    # Session
+    def new_session(self):
+        """
+        docs:
+            https://docs.aiohttp.org/en/stable/client_reference.html
+        summary:
+            Creates aiohttp session (connection pool) limited
+            to _ASYNC_MAX_IN_FLIGHT connections
+        returns: (1 value/s)
+            aiohttp.ClientSession object
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncApi requires aiohttp (pip install aiohttp)")
+        connector = aiohttp.TCPConnector(
+            limit=self._ASYNC_MAX_IN_FLIGHT,
+            limit_per_host=self._ASYNC_MAX_IN_FLIGHT
         )
-        return result
-# Unification of request responses
-class MGApiRequests(MGApiUtils):
+        return aiohttp.ClientSession(connector=connector, headers=self.ret_auth_header())
+    def ret_auth_header(self):
+        """
+        summary:
+            Returns basic Authorization header of session
+            (aiohttp.BasicAuth is deprecated)
+        returns: (1 value/s)
+            dictionary {"Authorization": "Basic <credentials>"}
+        """
+        credentials = "{api_user}:{private_key}".format(api_user=self.api_user, private_key=self.private_key)
+        return {"Authorization": "Basic {credentials}".format(
+            credentials=base64.b64encode(credentials.encode("utf8")).decode("ascii")
+        )}
+    def ret_session(self):
+        """
+        summary:
+            Returns current session, opens new one if it was closed.
+            Must be called from running event loop.
+        returns: (1 value/s)
+            aiohttp.ClientSession object
+        """
+        if self.session is None or self.session.closed:
+            self.session = self.new_session()
+            self._semaphore = asyncio.Semaphore(self._ASYNC_MAX_IN_FLIGHT)
+        return self.session
+    async def close(self):
+        """
+        summary:
+            Closes session and all pooled connections.
+            Safe to call more than once, next request opens new session.
+        """
+        session, self.session = self.session, None
+        if session is not None:
+            await session.close()
+    async def __aenter__(self):
+        return self
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def ret_request_pairs(self, params):
+        """
+        summary:
+            Encodes params/data the way requests does:
+            list values become repeated keys, None values are skipped
+        params:
+            params - dictionary
+        returns: (1 value/s)
+            list of (key, value) tuples
+        """
+        pairs = []
+        for key, value in params.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for single_value in values:
+                if single_value is None:
+                    continue
+                if isinstance(single_value, bool) or not isinstance(single_value, (str, int, float)):
+                    single_value = str(single_value)
+                pairs.append((key, single_value))
+        return pairs
 
     # RequestExtended
-    def requestEx(self, url, request_function, request_params):
+    async def requestEx(self, url, method, request_params, retry=None):
         """
         summary:
-            requests.request but with overkill exceptions and
-            option of choosing type of request
+            MGApiRequests.requestEx for asyncio, at most _ASYNC_MAX_IN_FLIGHT
+            requests are in flight at once
         params:
             url - URL of the api endpoint
-            request_function - method from one below:
-                                    self.get
-                                    self.post
-                                    self.put
-            request_params - parameters of chosen 'request_function'
+            method - {GET, POST, PUT}
+            request_params - parameters of aiohttp.ClientSession.request
+            retry - True/False force/disable retries, None - retry_policy decides by method
         returns: (3 value/s)
             reason - reason for exception
             success - indicator of success (Bool)
-            result - result of request
+            result - result of request (MGApiResult)
         """
-        timeout = self._REQUEST_TIMEOUT_SECONDS
+        # Authorization header is set on session (see new_session)
         request_params_common = {
-            "auth": (self.api_user, self.private_key),
-            "timeout": timeout
+            "timeout": aiohttp.ClientTimeout(total=self._REQUEST_TIMEOUT_SECONDS)
         }
         request_params = {**request_params, **request_params_common}
 
@@ -338,573 +3867,362 @@ class MGApiRequests(MGApiUtils):
         success = None
         result = None
 
-        try:
-            result = request_function(url, **request_params)
-            if result.status_code != 200:
-                deserialized_content = self.deserialize_json(result.content)
-                reason = "Status code:{status_code} | Message:{message} | Content:{content}".format(
-                    status_code=result.status_code,
-                    message=deserialized_content["message"] if "message" in deserialized_content.keys() else "KeyError",
-                    content=result.content
-                )
-                success, result = False, None
-            else:
-                # operation succeeded
-                reason, success, result = None, True, result
-        except Timeout as e:
-            reason, success, result = "Timeout: {exception}".format(exception=e), False, None
-        except ConnectionError as e:
-            reason, success, result = "ConnectionError: {exception}".format(exception=e), False, None
-        except Exception as e:
-            reason, success, result = "Unhandled Exception: {exception}".format(exception=e), False, None
+        endpoint = self.ret_endpoint(url)
+        attempt, first_failure = 0, None
+        metrics = self.metrics
+        if metrics is not None:
+            start, started = time.time(), time.perf_counter()
+        while True:
+            retryable = False
+            last = None
+            try:
+                session = self.ret_session()
+                await self.rate_limiter.acquire_async(endpoint)
+                async with self._semaphore:
+                    async with session.request(method, url, **request_params) as response:
+                        content = await response.read()
+                        result = last = MGApiResult(response.status, content, response.headers)
+                self.rate_limiter.feedback(endpoint, result.status_code, result.headers.get("Retry-After"))
+                if result.status_code != 200:
+                    retryable = result.status_code in self.retry_policy.retry_statuses
+                    deserialized_content = self.deserialize_json(result.content)
+                    reason = "Status code:{status_code} | Message:{message} | Content:{content}".format(
+                        status_code=result.status_code,
+                        message=deserialized_content["message"] if "message" in deserialized_content.keys() else "KeyError",
+                        content=result.content
+                    )
+                    success, result = False, None
+                else:
+                    # operation succeeded
+                    reason, success, result = None, True, result
+            except asyncio.TimeoutError as e:
+                retryable = True
+                reason, success, result = "Timeout: {exception}".format(exception=e), False, None
+            except aiohttp.ClientConnectionError as e:
+                retryable = True
+                reason, success, result = "ConnectionError: {exception}".format(exception=e), False, None
+            except Exception as e:
+                reason, success, result = "Unhandled Exception: {exception}".format(exception=e), False, None
+            if not retryable or not self.retry_policy.should_retry(method, attempt, retry=retry):
+                break
+            if first_failure is None:
+                first_failure = time.perf_counter()
+            await asyncio.sleep(self.retry_policy.ret_delay(attempt))
+            attempt += 1
 
+        self.retry_policy.record(attempt, time.perf_counter() - first_failure if first_failure else 0.0)
+        if metrics is not None:
+            metrics.record_request(
+                method, url, endpoint, start, time.perf_counter() - started,
+                status=last.status_code if last is not None else None,
+                bytes_sent=self.ret_body_size(request_params.get("data")),
+                bytes_received=len(last.content) if last is not None else 0,
+                retries=attempt,
+                reason=reason
+            )
         return reason, success, result
 
     # Requests
-    def get(self, url, params={}, **kwargs):
+    async def get(self, url, params={}, retry=None, **kwargs):
         """
-        docs:
-            http://docs.python-requests.org/en/master/
         summary:
-            Method used as requestEx method's parameter
-        params:
-            url - URL of the api endpoint
-            params - GET parameters
-        returns: (3 value/s)
-            reason - reason for exception
-            success - indicator of success (Bool)
-            result - result of request
+            GET request (see MGApiRequests.get)
         """
-        request_function = requests.get
         request_params = {
-            "params": params,
+            "params": self.ret_request_pairs(params),
             **kwargs
         }
-        self.print_debug("MGApiRequests.get", request_params);
-        reason, success, result = self.requestEx(url, request_function, request_params)
+        self.log_request("MGApiAsyncRequests.get", "GET", url, request_params)
+        reason, success, result = await self.requestEx(url, "GET", request_params, retry=retry)
         return reason, success, result
-    def post(self, url, data={}, **kwargs):
+    async def post(self, url, data={}, retry=None, **kwargs):
         """
-        docs:
-            http://docs.python-requests.org/en/master/
         summary:
-            Method used as requestEx method's parameter
-        params:
-            url - URL of the api endpoint
-            data - POST data
-        returns: (3 value/s)
-            reason - reason for exception
-            success - indicator of success (Bool)
-            result - result of request
+            POST request (see MGApiRequests.post)
         """
-        request_function = requests.post
         request_params = {
-            "data": data,
+            "data": self.ret_request_pairs(data),
             **kwargs
         }
-        self.print_debug("MGApiRequests.post", request_params);
-        reason, success, result = self.requestEx(url, request_function, request_params)
+        self.log_request("MGApiAsyncRequests.post", "POST", url, request_params)
+        reason, success, result = await self.requestEx(url, "POST", request_params, retry=retry)
         return reason, success, result
-    def put(self, url, data={}, **kwargs):
+    async def put(self, url, data={}, retry=None, **kwargs):
         """
-        docs:
-            http://docs.python-requests.org/en/master/
         summary:
-            Method used as requestEx method's parameter
-        params:
-            url - URL of the api endpoint
-            data - PUT data
-        returns: (3 value/s)
-            reason - reason for exception
-            success - indicator of success (Bool)
-            result - result of request
+            PUT request (see MGApiRequests.put)
         """
-        request_function = requests.put
         request_params = {
-            "data": data,
+            "data": self.ret_request_pairs(data),
             **kwargs
         }
-        self.print_debug("MGApiRequests.put", request_params);
-        reason, success, result = self.requestEx(url, request_function, request_params)
+        self.log_request("MGApiAsyncRequests.put", "PUT", url, request_params)
+        reason, success, result = await self.requestEx(url, "PUT", request_params, retry=retry)
         return reason, success, result
 
-    def parseResponse(self, reason, success, result, caller=""):
-        """
-        summary:
-            Judges if request was success by success parameter
-        params:
-            reason - reason for exception
-            success - indicator of success (Bool)
-            result - result of request
-            caller - caller method
-        returns: (2 value/s)
-            deserialized and serialized json
-        """
-        # Success
-        if success:
-            # Calling self.to_json should only occur when request
-            # is considered to be success=True
-            deserialized, serialized = self.to_json(result.content)
-            return deserialized, serialized
-        # Error
-        deserialized = {}
-        deserialized = self.justify(
-            deserialized,
-            "Operation failed: {caller}".format(caller=caller),
-            success=success,
-            reason=reason
-        )
-        return deserialized, self.serialize_json(deserialized)
-# Api
-class Api(MGApiRequests):
-    def __init__(self, domain="", api_user="", private_key="", base_url="", config_file=None, debug=None):
+    parseResponse = MGApiRequests.parseResponse
+    judgeResponse = MGApiRequests.judgeResponse
+# Api (asyncio)
+class AsyncApi(MGApiAsyncRequests):
+    """
+        Api with coroutine endpoint methods, e.g:
+            async with AsyncApi(config_file="config.json") as api:
+                deserialized, serialized = await api.get_domains()
+    """
+    def __init__(self, domain="", api_user="", private_key="", base_url="", config_file=None, debug=None,
+                 max_in_flight=None, rate_limits=None, retry_policy=None, json_backend=None):
+        if aiohttp is None:
+            raise ImportError("AsyncApi requires aiohttp (pip install aiohttp)")
         MGApiConfiguration.__init__(self)
         self._DEBUG = debug if debug is not None else self._DEBUG
+        self._JSON_BACKEND = json_backend if json_backend is not None else self._JSON_BACKEND
+        self._ASYNC_MAX_IN_FLIGHT = max_in_flight if max_in_flight is not None else self._ASYNC_MAX_IN_FLIGHT
+        # Session is opened on first request (see MGApiAsyncRequests.ret_session)
+        self.session = None
+        self._semaphore = None
+        self.metrics = None
+        self.rate_limiter = MGApiRateLimiter(
+            {**self._RATE_LIMITS, **(rate_limits if rate_limits else {})},
+            burst=self._RATE_LIMIT_BURST
+        )
+        self.retry_policy = retry_policy if retry_policy is not None else MGApiRetryPolicy(
+            max_attempts=self._RETRY_MAX_ATTEMPTS,
+            backoff_base=self._RETRY_BACKOFF_BASE,
+            backoff_cap=self._RETRY_BACKOFF_CAP,
+            jitter=self._RETRY_JITTER,
+            retry_statuses=self._RETRY_STATUSES,
+            methods=self._RETRY_METHODS
+        )
+        self.read_config(
+            domain=domain,
+            api_user=api_user,
+            private_key=private_key,
+            base_url=base_url,
+            config_file=config_file
+        )
 
-        if self._DEBUG: print(
-            "[DEBUG MODE IS ON] - you can change it in MGApiConfiguration class constructor"
-            );
-
-        # Config from parameters or config class
-        if config_file is None:
-            self.base_url    = base_url    if base_url    else self._BASE_URL
-            self.domain      = domain      if domain      else self._DOMAIN
-            self.private_key = private_key if private_key else self._PRIVATE_KEY
-            self.api_user    = api_user    if api_user    else self._API_USER
-        else:
-        # Config from config file
-            self.print_debug("Reading config file")
-            try:
-                with open(config_file, "rb") as config_content:
-                    config_json_serialized = config_content.read()
-            except FileNotFoundError as e:
-                print("FileNotFoundError: {exception}".format(exception=e))
-                exit(0)
-            except Exceptions as e:
-                print("Unhandled exception: {exception}".format(exception=e))
-                exit(0)
-            config_json_deserialized = self.deserialize_json(config_json_serialized)
-            self.print_debug("Config file JSON")
-            self.print_debug_pretty(config_json_deserialized)
-            self.api_user    = config_json_deserialized["api_user"]    if "api_user"    in config_json_deserialized.keys() else ""
-            self.domain      = config_json_deserialized["domain"]      if "domain"      in config_json_deserialized.keys() else ""
-            self.private_key = config_json_deserialized["private_key"] if "private_key" in config_json_deserialized.keys() else ""
-            self.base_url    = config_json_deserialized["base_url"]    if "base_url"    in config_json_deserialized.keys() else ""
+    ret_events_filter_fields = Api.ret_events_filter_fields
+    ret_additional_sending_options = Api.ret_additional_sending_options
+    enable_metrics = Api.enable_metrics
+    disable_metrics = Api.disable_metrics
 
     # Pagination
-    def follow_pagination(self, Next="", deserialized_response=""):
+    async def follow_pagination(self, Next="", deserialized_response="", raw=False):
         """
-        summary:
-            Follows pagination until items array lenght is 0
-        params:
-            deserialized_response - deserialized json (api response)
-        returns: (3 value/s)
-            exhausted - indicates that there is no items left
-            deserialized - deserialized json
-            serialized - serialized json
+            (see Api.follow_pagination)
         """
         exhausted = False
 
         if not Next and not deserialized_response:
-            return self.justify({},
+            deserialized = self.justify({},
                 "To follow pagination you need to provide at least one parameter",
                 success=False,
                 reason="'Next' and 'deserialized_response' is not set"
                 )
+            return MGApiResponse(deserialized, serialize_function=self.serialize_json, prefix=(exhausted,))
 
         if deserialized_response and not Next:
-            # Check if paging key exists
-            deserialized, serialized = self.not_in_justify(
+            # Check if paging and next keys exist
+            deserialized = self.not_in_justify(
                 "paging",
                 deserialized_response.keys(),
-                caller="Api.follow_pagination",
+                caller="AsyncApi.follow_pagination",
                 reason="KeyError 'paging'",
                 success=False
-            )
-            if deserialized and serialized:
-                return exhausted, deserialized, serialized
-            # Check if next key exists
-            deserialized, serialized = self.not_in_justify(
+            )[0]
+            if deserialized:
+                return MGApiResponse(deserialized, serialize_function=self.serialize_json, prefix=(exhausted,))
+            deserialized = self.not_in_justify(
                 "next",
                 deserialized_response["paging"].keys(),
-                caller="Api.follow_pagination",
+                caller="AsyncApi.follow_pagination",
                 reason="KeyError 'next' in paging",
                 success=False
-            )
-            if deserialized and serialized:
-                return exhausted, deserialized, serialized
+            )[0]
+            if deserialized:
+                return MGApiResponse(deserialized, serialize_function=self.serialize_json, prefix=(exhausted,))
             url = deserialized_response["paging"]["next"]
         else:
             url = Next
 
-        reason, success, result = self.get(url, params={})
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.follow_pagination")
-
-        exhausted = True if len(deserialized["items"]) == 0 else False
-        return exhausted, deserialized, serialized
+        reason, success, result = await self.get(url, params={})
+        response = self.parseResponse(reason, success, result, caller="AsyncApi.follow_pagination", raw=raw)
+        deserialized = response.deserialized
+        if deserialized["justify"]["success"]:
+            if raw:
+                exhausted = deserialized.get("empty", True)
+            else:
+                exhausted = True if len(deserialized["items"]) == 0 else False
+        return MGApiResponse(deserialized, response._serialized, response.serialize_function, prefix=(exhausted,))
+    async def iter_pages(self, deserialized_response):
+        """
+            (see Api.iter_pages)
+        """
+        self.check_pages(deserialized_response)
+        deserialized = deserialized_response
+        while True:
+            if not deserialized["justify"]["success"]:
+                raise MGApiException(deserialized)
+            if len(deserialized["items"]) == 0:
+                return
+            yield deserialized
+            exhausted, deserialized = (await self.follow_pagination(deserialized_response=deserialized))[:2]
+            if exhausted:
+                return
 
     # Domains
-    def get_domains(self, domain="", limit=100, skip=0):
+    async def get_domains(self, domain="", limit=100, skip=0):
         """
             GET /domains/<domain>
             GET /domains
         """
-        url = "{base_url}/domains".format(base_url=self.base_url)
-        if domain:
-            url = "{url}/{domain}".format(url=url, domain=domain)
-        # Optional prameters
-        params = {"limit": limit, "skip": skip}
-        reason, success, result = self.get(url, params=params)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.get_domains")
-        return deserialized, serialized
+        url, params = self.ret_domains_request(domain=domain, limit=limit, skip=skip)
+        reason, success, result = await self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.get_domains")
 
-    # Supressions (method used by get_bounces, get_unsubscribes and get_complaints)
-    def get_supressions(self, get_what, address="", domain="", limit=100, caller="<not_set>"):
+    # Supressions
+    async def get_supressions(self, get_what, address="", domain="", limit=100, caller="<not_set>"):
         """
-        summary:
-            DRY for get_bounces, get_complaints and get_unsubscribes
-        params:
-            get_what - {bounces, complaints, unsubscribes}
-            address - email address
-            domain - domain name
-            limit - limit of items returned
-            caller - caller method
-        returns: (2 value/s)
-            deserialized - deserialized json
-            serialized - serialized json
+            (see Api.get_supressions)
         """
-        # Set default if invalid limit value
-        if limit < 0 or limit > 10000: limit = 100;
-        # If domain is set use it else use domain from constructor
-        cp_domain = domain if domain else self.domain
-        url = "{base_url}/{domain}/{get_what}".format(base_url=self.base_url, domain=cp_domain, get_what=get_what)
-        if address:
-            url = "{url}/{address}".format(url=url, address=address)
-        # Optional prameters
-        params = {"limit": limit}
-        reason, success, result = self.get(url, params=params)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller=caller)
-        return deserialized, serialized
-    # Bounces
-    def get_bounces(self, address="", domain="", limit=100):
+        url, params = self.ret_supressions_request(get_what, address=address, domain=domain, limit=limit)
+        reason, success, result = await self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller=caller)
+    async def get_bounces(self, address="", domain="", limit=100):
         """
             GET /<domain>/bounces
             GET /<domain>/bounces/<address>
         """
-        deserialized, serialized = self.get_supressions(
-            "bounces",
-            address=address,
-            domain=domain,
-            limit=limit,
-            caller="Api.get_bounces"
-        )
-        return deserialized, serialized
-    # Unsubscribes
-    def get_unsubscribes(self, address="", domain="", limit=100):
+        return await self.get_supressions("bounces", address=address, domain=domain, limit=limit, caller="AsyncApi.get_bounces")
+    async def get_unsubscribes(self, address="", domain="", limit=100):
         """
             GET /<domain>/unsubscribes
             GET /<domain>/unsubscribes/<address>
         """
-        deserialized, serialized = self.get_supressions(
-            "unsubscribes",
-            address=address,
-            domain=domain,
-            limit=limit,
-            caller="Api.get_unsubscribes"
-        )
-        return deserialized, serialized
-    # Complaints
-    def get_complaints(self, address="", domain="", limit=100):
+        return await self.get_supressions("unsubscribes", address=address, domain=domain, limit=limit, caller="AsyncApi.get_unsubscribes")
+    async def get_complaints(self, address="", domain="", limit=100):
         """
             GET /<domain>/complaints
             GET /<domain>/complaints/<address>
         """
-        deserialized, serialized = self.get_supressions(
-            "complaints",
-            address=address,
-            domain=domain,
-            limit=limit,
-            caller="Api.get_complaints"
-        )
-        return deserialized, serialized
+        return await self.get_supressions("complaints", address=address, domain=domain, limit=limit, caller="AsyncApi.get_complaints")
 
     # Mailing Lists
-    def get_lists(self, address="", limit=100):
+    async def get_lists(self, address="", limit=100):
         """
             GET /lists/<address>
             GET /lists/pages
         """
-        url = "{base_url}/lists".format(base_url=self.base_url)
-        url = "{url}/{address}".format(url=url, address=address) if address else "{url}/pages".format(url=url)
-        # Optional prameters
-        params = {"limit": limit}
-        reason, success, result = self.get(url, params=params)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.get_lists")
-        return deserialized, serialized
-    def add_list(self, address, name="", description="", access_level="readonly"):
+        url, params = self.ret_lists_request(address=address, limit=limit)
+        reason, success, result = await self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.get_lists")
+    async def add_list(self, address, name="", description="", access_level="readonly"):
         """
             POST /lists
         """
-        url = "{base_url}/lists".format(base_url=self.base_url)
-        data = {
-            "address": address,
-            "name": name,
-            "description": description,
-            "access_level": access_level
-        }
-        reason, success, result = self.post(url, data=data)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.add_list")
-        return deserialized, serialized
-    def get_members(self, address, member_address="", limit=100, subscribed=None):
+        url, data = self.ret_add_list_request(address, name=name, description=description, access_level=access_level)
+        reason, success, result = await self.post(url, data=data)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.add_list")
+    async def get_members(self, address, member_address="", limit=100, subscribed=None):
         """
             GET /lists/<address>/members/<member_address>
             GET /lists/<address>/members/pages
         """
-        url = "{base_url}/lists/{address}/members".format(base_url=self.base_url, address=address)
-        url = "{url}/{member_address}".format(url=url, member_address=member_address) if member_address else "{url}/pages".format(url=url)
-        # Optional prameters
-        params = {"limit": limit}
-        if subscribed is not None:
-            params["subscribed"] = subscribed
-        reason, success, result = self.get(url, params=params)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.get_members")
-        return deserialized, serialized
-    def bulk_add_members(self, address, members, upsert="no"):
+        url, params = self.ret_members_request(address, member_address=member_address, limit=limit, subscribed=subscribed)
+        reason, success, result = await self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.get_members")
+    async def bulk_add_members(self, address, members, upsert="no"):
         """
             POST /lists/<address>/members.json
         """
-        url = "{base_url}/lists/{address}/members.json".format(base_url=self.base_url, address=address)
-        members_json_string = self.serialize_json(members)
-        data = {
-            "members": members_json_string,
-            "upsert": upsert
-        }
-        reason, success, result = self.post(url, data=data)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.bulk_add_members")
-        return deserialized, serialized
+        url, data = self.ret_bulk_add_members_request(address, members, upsert=upsert)
+        reason, success, result = await self.post(url, data=data)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.bulk_add_members")
 
     # Events
-    def ret_events_filter_fields(self):
+    async def get_events(self, domain="", begin="", end="", ascending="yes", limit=300, filter_fields={}, raw=False):
         """
-
+            GET /<domain>/events
         """
-        ret = {
-            "event": None,
-            "list": None,
-            "attachment": None,
-            "from": None,
-            "message-id": None,
-            "subject": None,
-            "to": None,
-            "size": None,
-            "recipient": None,
-            "tags": None,
-            "severity": None
-        }
-        return ret
-    def get_events(self, domain="", begin="", end="", ascending="yes", limit=300, filter_fields={}):
+        url, params = self.ret_events_request(
+            domain=domain,
+            begin=begin,
+            end=end,
+            ascending=ascending,
+            limit=limit,
+            filter_fields=filter_fields
+        )
+        reason, success, result = await self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.get_events", raw=raw)
+    async def iter_events(self, domain="", begin="", end="", ascending="yes", limit=300, filter_fields={}, chunked=False):
         """
-            GET /<domain>/events
+            (see Api.iter_events)
         """
-        limit = 100 if limit<0 or limit>300 else limit
-        # If domain is set use it else use domain from constructor
-        cp_domain = domain if domain else self.domain
-        url = "{base_url}/{domain}/events".format(base_url=self.base_url, domain=cp_domain)
-        # Optional prameters
-        params = {
-            "limit": limit
-        }
-        if begin:     params["begin"] = begin;
-        if end:       params["end"] = end;
-        if ascending: params["ascending"] = ascending;
-        for key, value in filter_fields.items():
-            if value is not None: params[key] = value;
-        reason, success, result = self.get(url, params=params)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.get_events")
-        return deserialized, serialized
+        deserialized = (await self.get_events(
+            domain=domain,
+            begin=begin,
+            end=end,
+            ascending=ascending,
+            limit=limit,
+            filter_fields=filter_fields
+        ))[0]
+        async for page in self.iter_pages(deserialized):
+            if chunked:
+                yield page["items"]
+            else:
+                for event in page["items"]:
+                    yield event
 
-    # Total stats
-    def get_stats_total(self, event, domain="", start="", end="", resolution="day", duration=""):
+    # Stats
+    async def get_stats_total(self, event, domain="", start="", end="", resolution="day", duration=""):
         """
             GET /<domain>/stats/total
         """
-        ### Copy paste - validation ( Event, Resolution ) ###
-        # Check if event is valid
-        deserialized, serialized = self.not_in_justify(
-            event,
-            self._EVENTS,
-            caller="Api.get_stats_total",
-            reason="Event name is not valid: {event}".format(event=event),
-            success=False
-            );
-        if deserialized and serialized:
-            return deserialized, serialized
-        # Check if resolution is valid
-        deserialized, serialized = self.not_in_justify(
-            resolution,
-            self._RESOLUTIONS,
-            caller="Api.get_stats_total",
-            reason="Resolution is not valid: {resolution}".format(resolution=resolution),
-            success=False
-            );
-        if deserialized and serialized:
-            return deserialized, serialized
-        ### Copy paste - validation ( Event, Resolution ) ###
-
-        # If domain is set use it else use domain from constructor
-        cp_domain = domain if domain else self.domain
-        params = {
-            "event": event,
-            "resolution": resolution
-        }
-        if start:    params["start"]    = start;
-        if end:      params["end"]      = end;
-        if duration: params["duration"] = duration;
-        url = "{base_url}/{domain}/stats/total".format(base_url=self.base_url, domain=cp_domain)
-        reason, success, result = self.get(url, params=params)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.get_stats_total")
-        return deserialized, serialized
+        response = self.ret_validation_error("AsyncApi.get_stats_total", event=event, resolution=resolution)
+        if response[0]:
+            return response
+        url, params = self.ret_stats_total_request(event, domain=domain, start=start, end=end, resolution=resolution, duration=duration)
+        reason, success, result = await self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.get_stats_total")
 
     # Tags
-    def get_tags(self, domain="", tag="", limit=100):
+    async def get_tags(self, domain="", tag="", limit=100):
         """
             GET /<domain>/tags
             GET /<domain>/tags/<tag>
         """
-        cp_domain = domain if domain else self.domain
-        url = "{base_url}/{domain}/tags".format(base_url=self.base_url, domain=cp_domain)
-        url = "{url}/{tag}".format(url=url, tag=tag) if tag else url
-        params = {
-            "limit": limit
-        }
-        reason, success, result = self.get(url, params=params)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.get_tags")
-        return deserialized, serialized
-    def get_tag_stats(self, tag, event, domain="", start="", end="", resolution="day", duration=""):
+        url, params = self.ret_tags_request(domain=domain, tag=tag, limit=limit)
+        reason, success, result = await self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.get_tags")
+    async def get_tag_stats(self, tag, event, domain="", start="", end="", resolution="day", duration=""):
         """
             GET /<domain>/tags/<tag>/stats
         """
-        ### Copy paste - validation ( Event, Resolution ) ###
-        # Check if event is valid
-        deserialized, serialized = self.not_in_justify(
-            event,
-            self._EVENTS,
-            caller="Api.get_tag_stats",
-            reason="Event name is not valid: {event}".format(event=event),
-            success=False
-            );
-        if deserialized and serialized:
-            return deserialized, serialized
-        # Check if resolution is valid
-        deserialized, serialized = self.not_in_justify(
-            resolution,
-            self._RESOLUTIONS,
-            caller="Api.get_tag_stats",
-            reason="Resolution is not valid: {resolution}".format(resolution=resolution),
-            success=False
-            );
-        if deserialized and serialized:
-            return deserialized, serialized
-        ### Copy paste - validation ( Event, Resolution ) ###
-
-        cp_domain = domain if domain else self.domain
-        url = "{base_url}/{domain}/tags/{tag}/stats".format(base_url=self.base_url, domain=cp_domain, tag=tag)
-        params = {
-            "event": event,
-            "resolution": resolution
-        }
-        if start:    params["start"]    = start;
-        if end:      params["end"]      = end;
-        if duration: params["duration"] = duration;
-
-        reason, success, result = self.get(url, params=params)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.get_tag_stats")
-        return deserialized, serialized
-    def get_tag_aggregates(self, tag, aggregate, domain=""):
+        response = self.ret_validation_error("AsyncApi.get_tag_stats", event=event, resolution=resolution)
+        if response[0]:
+            return response
+        url, params = self.ret_tag_stats_request(tag, event, domain=domain, start=start, end=end, resolution=resolution, duration=duration)
+        reason, success, result = await self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.get_tag_stats")
+    async def get_tag_aggregates(self, tag, aggregate, domain=""):
         """
             GET /<domain>/tags/<tag>/stats/aggregates/countries
             GET /<domain>/tags/<tag>/stats/aggregates/providers
             GET /<domain>/tags/<tag>/stats/aggregates/devices
         """
-        ### Copy paste - validation ( Aggregate ) ###
-        # Check if aggregate is valid
-        deserialized, serialized = self.not_in_justify(
-            aggregate,
-            self._AGGREGATES,
-            caller="Api.get_tag_aggregates",
-            reason="Aggregate name is not valid: {aggregate}".format(aggregate=aggregate),
-            success=False
-            );
-        if deserialized and serialized:
-            return deserialized, serialized
-        ### Copy paste - validation ( Aggregate ) ###
-        cp_domain = domain if domain else self.domain
-        url = "{base_url}/{domain}/tags/{tag}/stats/aggregates/{aggregate}".format(
-            base_url=self.base_url,
-            domain=cp_domain,
-            tag=tag,
-            aggregate=aggregate
-        )
-        params = {
-
-        }
-        reason, success, result = self.get(url, params=params)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.get_tag_aggregates")
-        return deserialized, serialized
+        response = self.ret_validation_error("AsyncApi.get_tag_aggregates", aggregate=aggregate)
+        if response[0]:
+            return response
+        url, params = self.ret_tag_aggregates_request(tag, aggregate, domain=domain)
+        reason, success, result = await self.get(url, params=params)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.get_tag_aggregates")
 
     # Sending
-    def ret_additional_sending_options(self, tracking=True, testmode=False):
-        """
-            return additional sending option
-        """
-        additional_options = {
-            "cc": None,
-            "bcc": None,
-            "attachment": None,
-            "inline": None,
-            "o:tag": [],
-            "o:dkim": None,
-            "o:deliverytime": None,
-            "o:testmode": None,
-            "o:tracking": None,
-            "o:tracking-clicks": None,
-            "o:tracking-opens": None,
-            "o:require-tls": None,
-            "o:skip-verification": None
-        }
-        if testmode:
-            additional_options["o:testmode"] = "yes"
-        if tracking:
-            additional_options["o:tracking"]        = "yes"
-            additional_options["o:tracking-clicks"] = "yes"
-            additional_options["o:tracking-opens"]  = "yes"
-
-        return additional_options
-    def send_single_message(self, From, to, subject, html, text, domain="", additional_sending_options=None):
+    async def send_single_message(self, From, to, subject, html, text, domain="", additional_sending_options=None):
         """
             POST /<domain>/messages
         """
-        # If domain is set use it else use domain from constructor
-        cp_domain = domain if domain else self.domain
-        # Set default additional_sending_options if not set by user
-        if additional_sending_options is None:
-            additional_sending_options = self.ret_additional_sending_options()
-        # debug
-        self.print_debug("Api.send_single_message", "PARAM additional_sending_options")
-        self.print_debug_pretty(additional_sending_options)
-        data = {
-            "from": From, "to": to,
-            "subject": subject, "html": html, "text": text
-        }
-        for key, value in additional_sending_options.items():
-            if value is not None:
-                data[key] = value
-        # debug
-        self.print_debug("Api.send_single_message", "POST data")
-        self.print_debug_pretty(data)
-        # Actual sending
-        url = "{base_url}/{domain}/messages".format(base_url=self.base_url, domain=cp_domain)
-
-        reason, success, result = self.post(url, data=data)
-        deserialized, serialized = self.parseResponse(reason, success, result, caller="Api.send_single_message")
-        return deserialized, serialized
+        url, data = self.ret_message_request(From, to, subject, html, text, domain=domain,
+                                             additional_sending_options=additional_sending_options)
+        reason, success, result = await self.post(url, data=data)
+        return self.parseResponse(reason, success, result, caller="AsyncApi.send_single_message")
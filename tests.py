@@ -1,5 +1,29 @@
+import asyncio
+import base64
+import datetime
+import gc
+import gzip
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
 import unittest
+import warnings
+from email.utils import formatdate
+from email.utils import parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
 from mgapi.mgapi import Api as MailgunApi
+from mgapi.mgapi import AsyncApi as AsyncMailgunApi
+from mgapi.mgapi import MGApiException
+from mgapi.mgapi import MGApiNDJSONWriter
+from mgapi.mgapi import MGApiRateLimiter
+from mgapi.mgapi import MGApiRetryPolicy
+from mgapi.mgapi import MGApiSupressionIndex
+from mgapi.mgapi import MGApiTimestamps
 
 # Tests configuration - Start
 config_file           = "C:\\Users\\Account\\Desktop\\config.json"
@@ -18,11 +42,106 @@ _api_builtin_debug    = False
 # Tests configuration - Stop
 
 _v = _verbose_responses
-api = MailgunApi(config_file=config_file, debug=_api_builtin_debug)
+# Tests of Mailgun API need config_file, the rest runs offline or against local stub server
+live = os.path.exists(config_file)
+if live:
+    api = MailgunApi(config_file=config_file, debug=_api_builtin_debug)
+else:
+    api = MailgunApi(domain=existing_domain, private_key="key-test", debug=_api_builtin_debug)
+
+
+# Local stub server, tests using it need no Mailgun account
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    events = [{"id": "event-{i}".format(i=i), "event": "accepted", "timestamp": 1529692199.0 + i} for i in range(250)]
+    # Oldest first
+    bounces = [{"address": "Bounced{i}@example.io".format(i=i), "created_at": "Fri, 22 Jun 2018 18:{i:02d}:00 UTC".format(i=i)}
+               for i in range(30)]
+    members = [{"address": "member{i}@example.io".format(i=i), "name": "Member {i}".format(i=i), "subscribed": True, "vars": {}}
+               for i in range(120)]
+    etag = '"domains-1"'
+    authorization = None
+    # Daily stats from Fri, 22 Jun 2018 00:00:00
+    stats_start = 1529625600
+    requests = []
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        self.respond()
+
+    def respond(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        StubHandler.requests.append((self.command, self.path, body))
+        StubHandler.authorization = self.headers.get("Authorization")
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        status, content, headers = 200, {"items": [], "total_count": 0}, {}
+        if "missing" in url.path:
+            status, content = 404, {"message": "Not found"}
+        elif url.path.endswith("/events"):
+            content = self.page(url.path, query, [
+                event for event in self.events
+                if self.ret_timestamp(query.get("begin"), 0) <= event["timestamp"] <= self.ret_timestamp(query.get("end"), float("inf"))
+            ])
+        elif url.path.endswith("/members/pages"):
+            content = self.page(url.path, query, self.members)
+        elif url.path.endswith("/bounces") and self.command == "GET":
+            content = self.page(url.path, query, self.bounces)
+        elif url.path.endswith("/messages"):
+            content = {"id": "<message-id>", "message": "Queued. Thank you."}
+        elif url.path.endswith("/stats/total") or url.path.endswith("/stats"):
+            # "delivered" has no stats on first day
+            days = range(1, 3) if query.get("event") == "delivered" else range(3)
+            content = {"resolution": query.get("resolution"), "stats": [
+                {"time": formatdate(self.stats_start + day * 86400, usegmt=True), query.get("event"): {"total": day + 1}}
+                for day in days
+            ]}
+        elif url.path.endswith("/domains"):
+            headers["ETag"] = self.etag
+            if self.headers.get("If-None-Match") == self.etag:
+                status, content = 304, None
+        content = json.dumps(content).encode("utf8") if content is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def ret_timestamp(self, value, default):
+        # begin/end as unix timestamp or RFC2822 string
+        if value is None:
+            return default
+        try:
+            return float(value)
+        except ValueError:
+            return parsedate_to_datetime(value).timestamp()
+
+    def page(self, path, query, items):
+        skip, limit = int(query.get("skip", 0)), int(query.get("limit", 100))
+        query = {**query, "skip": skip + limit}
+        return {"items": items[skip:skip + limit], "paging": {"next": "http://{host}:{port}{path}?{query}".format(
+            host=self.server.server_address[0], port=self.server.server_address[1], path=path,
+            query="&".join("{key}={value}".format(key=key, value=value) for key, value in query.items())
+        )}}
+
+    def log_message(self, *argv):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://127.0.0.1:{port}/v3".format(port=server.server_address[1])
+
 
 ### Convention
 # - class:   class <RequestType>_<TestCaseName>_TestCase
 # - method:  def test__<MethodName>__<StateUnderTest>_<ExpectedBehavior>
+@unittest.skipUnless(live, "requires Mailgun account (config_file)")
 class GET_JustificationSuccess_TestCase(unittest.TestCase):
 
     def test__get_domains__CorrectParams_True(self):
@@ -73,5 +192,526 @@ class GET_JustificationSuccess_TestCase(unittest.TestCase):
         self.assertTrue(des["justify"]["success"])
 
 
+class GET_StubIterators_TestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.base_url = start_stub_server()
+        cls.api = MailgunApi(domain="example.io", private_key="key-stub", base_url=cls.base_url)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test__iter_events_parallel__StubServer_OrderedUnique(self):
+        begin, end = StubHandler.events[0]["timestamp"], StubHandler.events[-1]["timestamp"]
+        events = list(self.api.iter_events_parallel(begin, end, slices=4, limit=20, depth=1))
+        self.assertEqual([event["id"] for event in events], [event["id"] for event in StubHandler.events])
+
+    def test__poll_events__BeginEpoch_AllEventsAndCheckpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_file = os.path.join(directory, "checkpoint.json")
+            events = list(self.api.poll_events(checkpoint_file, begin=0, threshold=0, limit=100))
+            self.assertEqual(len(events), len(StubHandler.events))
+            self.assertTrue(os.path.exists(checkpoint_file))
+
+    def test__refresh__NewListingItems_OnlyMissingCounted(self):
+        index = MGApiSupressionIndex()
+        bounces = StubHandler.bounces
+        try:
+            StubHandler.bounces = bounces[:20]
+            self.assertEqual(index.refresh(self.api, full=True), 20)
+            StubHandler.bounces = bounces
+            self.assertEqual(index.refresh(self.api), 10)
+            self.assertEqual(index.refresh(self.api), 0)
+        finally:
+            StubHandler.bounces = bounces
+        self.assertTrue(index.is_suppressed("bounced25@example.io"))
+        self.assertEqual(len(index.bounces), len(bounces))
+
+    def test__send_single_message__SuppressedCc_Filtered(self):
+        index_api = MailgunApi(domain="example.io", private_key="key-stub", base_url=self.base_url)
+        index_api.supression_index = MGApiSupressionIndex()
+        index_api.supression_index.refresh(index_api, full=True)
+        options = index_api.ret_additional_sending_options()
+        options["cc"] = ["Bounced1@example.io", "cc@example.io"]
+        options["bcc"] = "Bounced2@example.io"
+        des, ser = index_api.send_single_message("sender@example.io", "to@example.io", "Subject", "<p>html</p>", "text",
+                                                 additional_sending_options=options)
+        self.assertTrue(des["justify"]["success"])
+        data = parse_qs(StubHandler.requests[-1][2].decode("utf8"))
+        self.assertEqual(data["cc"], ["cc@example.io"])
+        self.assertNotIn("bcc", data)
+
+    def test__send_single_message__AllSuppressed_ResponseWithoutRequest(self):
+        index_api = MailgunApi(domain="example.io", private_key="key-stub", base_url=self.base_url)
+        index_api.supression_index = MGApiSupressionIndex()
+        index_api.supression_index.refresh(index_api, full=True)
+        sent = len(StubHandler.requests)
+        response = index_api.send_single_message("sender@example.io", "Bounced1@example.io", "Subject", "<p>html</p>", "text")
+        self.assertFalse(response.deserialized["justify"]["success"])
+        self.assertEqual(json.loads(response.serialized), response.deserialized)
+        self.assertEqual(len(StubHandler.requests), sent)
+
+    def test__follow_pagination__NoPaging_Response(self):
+        response = self.api.follow_pagination(deserialized_response={"items": []})
+        self.assertFalse(response[0])
+        self.assertFalse(response.deserialized["justify"]["success"])
+        self.assertFalse(self.api.get_stats_total(event="no_such_event").deserialized["justify"]["success"])
+
+    def test__get_report_data__UnknownEventType_AllTypesKeyedOthersSkipped(self):
+        events, now = StubHandler.events, time.time()
+        try:
+            StubHandler.events = [{"id": "event-{i}".format(i=i), "event": event, "timestamp": now - 3600 + i}
+                                  for i, event in enumerate(["accepted", "delivered", "list_member_uploaded", "delivered"])]
+            des = self.api.get_report_data("MyTag", days=1)[0]
+        finally:
+            StubHandler.events = events
+        self.assertTrue(des["justify"]["success"])
+        self.assertEqual(set(des["tag_events"].keys()), set(self.api._EVENTS))
+        self.assertEqual([event["id"] for event in des["tag_events"]["delivered"]], ["event-1", "event-3"])
+        self.assertEqual(des["tag_events"]["failed"], [])
+        self.assertIn("total", des["timings"])
+
+    def test__get_stats_table__TagsAndEvents_OneRequestEachTimeAligned(self):
+        sent = len(StubHandler.requests)
+        des = self.api.get_stats_table(["accepted", "delivered", "accepted"], tags=["A", "B", "A"])[0]
+        stats_requests = [path for method, path, body in StubHandler.requests[sent:] if "/stats" in path]
+        self.assertTrue(des["justify"]["success"])
+        self.assertEqual(len(stats_requests), 4)
+        table = des["tables"]["day"]
+        self.assertEqual(table["time"], [StubHandler.stats_start + day * 86400 for day in range(3)])
+        self.assertEqual(sorted(table["columns"]), [
+            "example.io/A:accepted.total", "example.io/A:delivered.total",
+            "example.io/B:accepted.total", "example.io/B:delivered.total"
+        ])
+        self.assertEqual(table["columns"]["example.io/A:accepted.total"], [1, 2, 3])
+        self.assertEqual(table["columns"]["example.io/B:delivered.total"], [0, 2, 3])
+
+    def test__iter_members__Prefetch_SameMembersInOrder(self):
+        members = [member["address"] for member in self.api.iter_members("list@example.io")]
+        prefetched = [member["address"] for member in self.api.iter_members("list@example.io", prefetch=True)]
+        self.assertEqual(members, [member["address"] for member in StubHandler.members])
+        self.assertEqual(prefetched, members)
+
+    def test__export_members__Csv_AllMembers(self):
+        target = io.BytesIO()
+        self.assertEqual(self.api.export_members("list@example.io", target, compression=None), len(StubHandler.members))
+        rows = target.getvalue().decode("utf8").splitlines()
+        self.assertEqual(rows[0], "address,name,subscribed,vars")
+        self.assertEqual(len(rows), len(StubHandler.members) + 1)
+
+    def test__iter_events__Chunked_YieldsPages(self):
+        pages = list(self.api.iter_events(begin=0, limit=100, chunked=True))
+        self.assertEqual([len(page) for page in pages], [100, 100, 50])
+
+    def test__iter_events__PrefetchDepth_SameEventsInOrder(self):
+        events = [event["id"] for event in self.api.iter_events(begin=0, limit=20)]
+        prefetched = [event["id"] for event in self.api.iter_events(begin=0, limit=20, prefetch=3)]
+        self.assertEqual(events, [event["id"] for event in StubHandler.events])
+        self.assertEqual(prefetched, events)
+
+    def test__iter_pages__PrefetchFailedPage_MGApiException(self):
+        first_page = self.api.justify({"items": [{"id": "a"}], "paging": {"next": self.base_url + "/missing/events/next"}},
+                                      "Operation succeeded.")
+        pages = self.api.iter_pages(first_page, prefetch=2)
+        self.assertEqual(next(pages)["items"], [{"id": "a"}])
+        with self.assertRaises(MGApiException):
+            next(pages)
+
+    def test__iter_bounces__SmallPages_NoDuplicates(self):
+        addresses = [bounce["address"] for bounce in self.api.iter_bounces(limit=7)]
+        self.assertEqual(addresses, [bounce["address"] for bounce in StubHandler.bounces])
+
+    def test__iter_events_parallel__SliceBoundaryEvents_YieldedOnce(self):
+        # 249 seconds in 3 slices, boundaries fall on event timestamps (both slices return them)
+        begin, end = StubHandler.events[0]["timestamp"], StubHandler.events[-1]["timestamp"]
+        events = list(self.api.iter_events_parallel(begin, end, slices=3, limit=50, depth=1))
+        self.assertEqual([event["id"] for event in events], [event["id"] for event in StubHandler.events])
+
+    def test__iter_events_parallel__ZeroSlices_ValueError(self):
+        with self.assertRaises(ValueError):
+            next(self.api.iter_events_parallel(0, 1, slices=0))
+
+    def test__export_members__FailedRequest_CallerStreamOpen(self):
+        target = io.BytesIO()
+        with self.assertRaises(MGApiException):
+            self.api.export_members("missing@example.io", target, compression=None)
+        gc.collect()
+        self.assertFalse(target.closed)
+
+
+class GET_AsyncJustificationSuccess_TestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.base_url = start_stub_server()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def run_async(self, coroutine_function):
+        async def runner():
+            async with AsyncMailgunApi(domain="example.io", private_key="key-stub", base_url=self.base_url) as async_api:
+                return await coroutine_function(async_api)
+        return asyncio.run(runner())
+
+    def test__get_domains__StubServer_True(self):
+        des, ser = self.run_async(lambda async_api: async_api.get_domains())
+        self.assertTrue(des["justify"]["success"])
+        self.assertEqual(json.loads(ser), des)
+
+    def test__get_domains__BasicAuthHeader_NoDeprecationWarning(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            des = self.run_async(lambda async_api: async_api.get_domains())[0]
+        self.assertTrue(des["justify"]["success"])
+        self.assertEqual(StubHandler.authorization, "Basic " + base64.b64encode(b"api:key-stub").decode("ascii"))
+
+    def test__get_domains__NotFound_False(self):
+        des, ser = self.run_async(lambda async_api: async_api.get_domains(domain="missing.io"))
+        self.assertFalse(des["justify"]["success"])
+
+    def test__get_stats_total__InvalidEvent_FalseWithoutRequest(self):
+        sent = len(StubHandler.requests)
+        des, ser = self.run_async(lambda async_api: async_api.get_stats_total(event="no_such_event"))
+        self.assertFalse(des["justify"]["success"])
+        self.assertEqual(len(StubHandler.requests), sent)
+
+    def test__get_stats_total__ConcurrentRequests_AllTrue(self):
+        async def gather_stats(async_api):
+            return await asyncio.gather(*[
+                async_api.get_stats_total(event=event) for event in async_api._EVENTS
+            ])
+        for des, ser in self.run_async(gather_stats):
+            self.assertTrue(des["justify"]["success"])
+
+    def test__iter_events__StubServer_AllEventsInOrder(self):
+        async def collect(async_api):
+            return [event["id"] async for event in async_api.iter_events(limit=100)]
+        self.assertEqual(self.run_async(collect), [event["id"] for event in StubHandler.events])
+
+    def test__send_single_message__Metrics_BytesSentOfForm(self):
+        async def send(async_api):
+            metrics = async_api.enable_metrics()
+            await async_api.send_single_message(
+                "sender@example.io", ["a@example.io", "b@example.io"], "Subject", "<p>html</p>", "text"
+            )
+            return metrics.ret_spans()
+        spans = self.run_async(send)
+        self.assertEqual(spans[-1]["attributes"]["http.request.body.size"], len(StubHandler.requests[-1][2]))
+        self.assertGreater(spans[-1]["attributes"]["http.request.body.size"], 0)
+
+    def test__send_single_message__StubServer_FormEncoded(self):
+        des, ser = self.run_async(lambda async_api: async_api.send_single_message(
+            "sender@example.io", ["a@example.io", "b@example.io"], "Subject", "<p>html</p>", "text"
+        ))
+        self.assertTrue(des["justify"]["success"])
+        method, path, body = StubHandler.requests[-1]
+        self.assertEqual(method, "POST")
+        self.assertEqual(parse_qs(body.decode("utf8"))["to"], ["a@example.io", "b@example.io"])
+
+
+class GET_StubResponseCache_TestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server, cls.base_url = start_stub_server()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def cached_api(self, private_key="key-stub"):
+        cached_api = MailgunApi(domain="example.io", private_key=private_key, base_url=self.base_url)
+        return cached_api, cached_api.enable_cache()
+
+    def test__get_domains__SecondCall_CacheHit(self):
+        cached_api, cache = self.cached_api()
+        first = cached_api.get_domains()[0]
+        second = cached_api.get_domains()[0]
+        self.assertTrue(second["justify"]["success"])
+        self.assertEqual(first["items"], second["items"])
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 1, "revalidated": 0})
+
+    def test__get_domains__ExpiredEntry_Revalidated(self):
+        cached_api = MailgunApi(domain="example.io", private_key="key-stub", base_url=self.base_url)
+        cache = cached_api.enable_cache(ttls={"domains": 0.05})
+        cached_api.get_domains()
+        time.sleep(0.1)
+        des = cached_api.get_domains()[0]
+        self.assertTrue(des["justify"]["success"])
+        self.assertEqual(des["items"], [])
+        self.assertEqual(StubHandler.requests[-1][0], "GET")
+        self.assertEqual(cache.stats, {"hits": 0, "misses": 2, "revalidated": 1})
+
+    def test__get_events__NotCacheable_NoHit(self):
+        cached_api, cache = self.cached_api()
+        cached_api.get_events()
+        cached_api.get_events()
+        self.assertEqual(cache.stats, {"hits": 0, "misses": 0, "revalidated": 0})
+
+    def test__get_members__MembersFamily_NotCached(self):
+        cached_api, cache = self.cached_api()
+        cached_api.get_members("list@example.io")
+        cached_api.get_members("list@example.io")
+        self.assertEqual(cache.stats["hits"], 0)
+
+    def test__bulk_add_members__CachedList_Invalidated(self):
+        cached_api, cache = self.cached_api()
+        cached_api.get_lists()
+        cached_api.get_lists(address="list@example.io")
+        cached_api.bulk_add_members("list@example.io", [{"address": "new@example.io"}])
+        cached_api.get_lists()
+        cached_api.get_lists(address="list@example.io")
+        self.assertEqual(cache.stats["hits"], 0)
+        self.assertEqual(cache.stats["misses"], 4)
+
+    def test__get_domains__SharedCacheOtherAccount_Miss(self):
+        cached_api, cache = self.cached_api()
+        other_api = MailgunApi(domain="example.io", private_key="key-other", base_url=self.base_url)
+        other_api.cache = cache
+        cached_api.get_domains()
+        other_api.get_domains()
+        self.assertEqual(cache.stats["hits"], 0)
+        cached_api.get_domains()
+        self.assertEqual(cache.stats["hits"], 1)
+
+
+class Stats_Vectorized_TestCase(unittest.TestCase):
+
+    def hourly_response(self, days=2):
+        return {"resolution": "hour", "stats": [{
+            "time": "Mon, {day:02d} Jan 2024 {hour:02d}:00:00 UTC".format(day=1 + hour // 24, hour=hour % 24),
+            "accepted": {"total": 10}, "delivered": {"total": 8}, "opened": {"total": 2}
+        } for hour in range(24 * days)]}
+
+    def test__resample__HourToDay_SumsCounters(self):
+        stats = api.ret_stats(self.hourly_response()).resample("day")
+        self.assertEqual(list(stats.column("accepted.total")), [240, 240])
+
+    def test__rates__HourlyStats_Vectorized(self):
+        stats = api.ret_stats(self.hourly_response())
+        self.assertAlmostEqual(stats.delivery_rate()[0], 0.8)
+        self.assertAlmostEqual(stats.open_rate()[0], 0.25)
+
+    def test__rolling_sum__Window_PartialThenFull(self):
+        stats = api.ret_stats(self.hourly_response())
+        self.assertEqual(list(stats.rolling_sum(3, "accepted.total")[:4]), [10, 20, 30, 30])
+
+    def test__rolling_sum__ZeroWindow_ValueError(self):
+        with self.assertRaises(ValueError):
+            api.ret_stats(self.hourly_response()).rolling_sum(0)
+
+
+class Timestamps_Vectorized_TestCase(unittest.TestCase):
+    timestamps = [1529692199.626182, 1529692200.0, 1577836799.5]
+
+    def test__to_rfc2822__Column_SameAsFormatdate(self):
+        formatted = MGApiTimestamps.to_rfc2822(self.timestamps)
+        self.assertEqual(list(formatted), [
+            "Fri, 22 Jun 2018 18:29:59 +0000", "Fri, 22 Jun 2018 18:30:00 +0000", "Tue, 31 Dec 2019 23:59:59 +0000"
+        ])
+        self.assertEqual(list(MGApiTimestamps.from_rfc2822(formatted)), [1529692199, 1529692200, 1577836799])
+
+    def test__from_iso8601__Offsets_TimezoneCorrect(self):
+        parsed = MGApiTimestamps.from_iso8601([
+            "2018-06-22T18:29:59.626182Z", "2018-06-22T20:29:59.626182+02:00", "2018-06-22T18:29:59.626182"
+        ])
+        for timestamp in parsed:
+            self.assertAlmostEqual(timestamp, self.timestamps[0], places=5)
+
+    def test__ISO8601__InvalidString_False(self):
+        self.assertFalse(api.ISO8601("not a date"))
+
+    def test__ISO8601__ZuluString_NaiveUTC(self):
+        self.assertEqual(api.ISO8601("2018-06-22T20:29:59.626182+02:00"), datetime.datetime(2018, 6, 22, 18, 29, 59))
+        self.assertEqual(api.ISO8601("2018-06-22T18:29:59.626182Z", aware=True).tzinfo, datetime.timezone.utc)
+
+
+class JSON_RawMode_TestCase(unittest.TestCase):
+    page = b'{"items": [{"id": "a"}], "paging": {"next": "https://api.mailgun.net/v3/example.io/events/next"}}'
+
+    def test__to_raw__PaginatedPage_PagingWithoutItems(self):
+        des, body = api.to_raw(self.page)
+        self.assertEqual(des["paging"]["next"], "https://api.mailgun.net/v3/example.io/events/next")
+        self.assertFalse(des["empty"])
+        self.assertEqual(bytes(body), self.page)
+
+    def test__deserialize_json__Memoryview_SameAsBytes(self):
+        self.assertEqual(api.deserialize_json(memoryview(self.page)), api.deserialize_json(self.page))
+
+    def test__to_json__Unpacked_RealStr(self):
+        des, ser = api.to_json(self.page)
+        self.assertIs(type(ser), str)
+        self.assertEqual(json.loads(ser), des)
+        self.assertEqual(api.to_json(self.page)[0], des)
+
+    def test__iter_pages__RawPage_ValueError(self):
+        des, body = api.to_raw(self.page)
+        with self.assertRaises(ValueError):
+            next(api.iter_pages(des))
+
+
+class NDJSONWriter_Compression_TestCase(unittest.TestCase):
+
+    def test__write_many__Gzip_OneObjectPerLine(self):
+        target = io.BytesIO()
+        with MGApiNDJSONWriter(target, compression="gzip") as writer:
+            writer.write_many([{"id": "a"}, {"id": "b"}])
+            writer.write({"id": "c"})
+        lines = gzip.decompress(target.getvalue()).splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], ["a", "b", "c"])
+        self.assertEqual(writer.count, 3)
+
+
+class Metrics_Instrumentation_TestCase(unittest.TestCase):
+
+    class Response():
+        status_code = 200
+        content = b'{"items": [], "total_count": 0}'
+        headers = {}
+
+        class request():
+            body = "name=value"
+
+    def test__to_prometheus__RecordedRequests_CountedByCaller(self):
+        metrics_api = MailgunApi(domain=existing_domain, private_key="key-test")
+        metrics = metrics_api.enable_metrics()
+        for _ in range(3):
+            result = metrics_api.requestEx(metrics_api.base_url + "/domains", lambda url, **params: self.Response, {})
+            metrics_api.parseResponse(*result, caller="Api.get_domains")
+        exported = metrics.to_prometheus()
+        self.assertIn('mgapi_request_duration_seconds_count{caller="Api.get_domains"} 3', exported)
+        self.assertIn('mgapi_responses_total{caller="Api.get_domains",status="200"} 3', exported)
+        self.assertIn('mgapi_request_bytes_sent_total{caller="Api.get_domains"} 30', exported)
+        spans = metrics.ret_spans()
+        self.assertEqual(len(spans), 3)
+        self.assertEqual(spans[0]["attributes"]["mgapi.endpoint"], "domains")
+
+
+class Logging_Payload_TestCase(unittest.TestCase):
+
+    def test__ret_log_payload__MessageData_RedactedAndTruncated(self):
+        data = {"to": "receiver@example.io", "html": "<p>" + "x" * 5000 + "</p>", "subject": "s" * 1000}
+        formatted = str(api.ret_log_payload(data))
+        self.assertNotIn("xxx", formatted)
+        self.assertIn("<redacted 5007 chars>", formatted)
+        self.assertIn("...(1000 chars)", formatted)
+
+    def test__log_request__Sampled_FractionOfRecords(self):
+        with self.assertLogs("mgapi", level="DEBUG") as logs:
+            sample_rate, api._LOG_SAMPLE_RATE = api._LOG_SAMPLE_RATE, 0.1
+            try:
+                for _ in range(1000):
+                    api.log_request("MGApiRequests.get", "GET", api.base_url + "/domains", {"params": {}})
+                api.print_debug("always")
+            finally:
+                api._LOG_SAMPLE_RATE = sample_rate
+        self.assertLess(len(logs.records), 200)
+
+    def test__enable_debug_logging__OneObject_SharedLoggerUntouched(self):
+        level = logging.getLogger("mgapi").level
+        debug_api = MailgunApi(domain=existing_domain, private_key="key-test")
+        stream = io.StringIO()
+        debug_api.enable_debug_logging(stream)
+        debug_api.print_debug("debug object")
+        self.assertIn("debug object", stream.getvalue())
+        self.assertEqual(logging.getLogger("mgapi").level, level)
+        self.assertFalse(MailgunApi(domain=existing_domain, private_key="key-test").logger.isEnabledFor(logging.DEBUG))
+
+
+class RateLimiter_SimulatedLoad_TestCase(unittest.TestCase):
+
+    def simulate_load(self, limiter, key, threads=8, duration=1.0):
+        timestamps = []
+        lock = threading.Lock()
+        stop_at = time.monotonic() + duration
+        def worker():
+            while True:
+                limiter.acquire(key)
+                now = time.monotonic()
+                if now > stop_at:
+                    return
+                with lock:
+                    timestamps.append(now)
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for worker_thread in workers: worker_thread.start()
+        for worker_thread in workers: worker_thread.join()
+        return timestamps
+
+    def test__acquire__ConcurrentThreads_HoldsTargetRate(self):
+        limiter = MGApiRateLimiter({"sending": 50}, burst=1)
+        timestamps = self.simulate_load(limiter, ("example.io", "sending"))
+        # burst + rate * duration
+        self.assertLessEqual(len(timestamps), 51)
+        self.assertGreaterEqual(len(timestamps), 45)
+
+    def test__acquire__PerDomainRate_OverridesFamilyRate(self):
+        limiter = MGApiRateLimiter({"sending": 50, ("slow.io", "sending"): 10}, burst=1)
+        timestamps = self.simulate_load(limiter, ("slow.io", "sending"))
+        self.assertLessEqual(len(timestamps), 11)
+
+    def test__feedback__RetryAfter_BlocksBucket(self):
+        limiter = MGApiRateLimiter({}, burst=1)
+        key = ("example.io", "events")
+        limiter.feedback(key, 429, retry_after="0.3")
+        start = time.monotonic()
+        limiter.acquire(key)
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def test__feedback__TooManyRequests_HalvesRate(self):
+        limiter = MGApiRateLimiter({"stats": 40}, burst=1)
+        key = ("example.io", "stats")
+        limiter.feedback(key, 429)
+        timestamps = self.simulate_load(limiter, key)
+        self.assertLessEqual(len(timestamps), 21 + 1)
+
+    def test__ret_rate__DefaultOnly_AppliesToEveryFamily(self):
+        limiter = MailgunApi(domain=existing_domain, private_key="key-test", rate_limits={"default": 5}).rate_limiter
+        for family in ("sending", "events", "stats", "tags"):
+            self.assertEqual(limiter.ret_rate(("example.io", family)), 5)
+
+    def test__feedback__UnlimitedWithoutRetryAfter_SeedsRate(self):
+        limiter = MGApiRateLimiter({}, burst=1)
+        key = ("example.io", "events")
+        for _ in range(5):
+            limiter.acquire(key)
+            time.sleep(0.01)
+        limiter.feedback(key, 429)
+        self.assertIsNotNone(limiter.buckets[key]["rate"])
+        start = time.monotonic()
+        limiter.acquire(key)
+        self.assertGreater(time.monotonic() - start, 0.005)
+
+
+class RetryPolicy_Backoff_TestCase(unittest.TestCase):
+
+    def test__should_retry__GetByDefault_True(self):
+        policy = MGApiRetryPolicy(max_attempts=3)
+        self.assertTrue(policy.should_retry("GET", 0))
+        self.assertTrue(policy.should_retry("GET", 1))
+        self.assertFalse(policy.should_retry("GET", 2))
+
+    def test__should_retry__PostOptIn_True(self):
+        policy = MGApiRetryPolicy(max_attempts=3)
+        self.assertFalse(policy.should_retry("POST", 0))
+        self.assertTrue(policy.should_retry("POST", 0, retry=True))
+        self.assertFalse(policy.should_retry("GET", 0, retry=False))
+
+    def test__ret_delay__Jitter_BetweenZeroAndCap(self):
+        policy = MGApiRetryPolicy(backoff_base=0.5, backoff_cap=4.0, jitter=True)
+        for attempt in range(10):
+            delay = policy.ret_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(4.0, 0.5 * 2 ** attempt))
+        policy.jitter = False
+        self.assertEqual(policy.ret_delay(10), 4.0)
+
+
 if __name__ == "__main__":
     unittest.main()